@@ -1,44 +1,136 @@
-from pymongo import MongoClient
-from datetime import datetime
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from dotenv import find_dotenv, load_dotenv
 import os
+import uuid
 
-client = MongoClient(os.getenv("MONGO_URI"))
-db = client["memberdb"]
-alerts_collection = db["alerts"]
-
-alerts_collection.delete_many({})
-
-alerts = []
-
-# Through all orgs
-for collection_name in db.list_collection_names():
-    if collection_name == "alerts":
-        continue
-
-    collection = db[collection_name]
-
-    for member in collection.find():
-        gpa = float(member.get("GPA", 4.0))
-        grad_year = member.get("Graduation Year", "")
-
-        if gpa < 2.0:
-            alerts.append({
-                "organization_name": collection_name,
-                "member_name": member["Name"],
-                "alert_type": "low_gpa",
-                "details": {"GPA": gpa},
-                "timestamp": datetime.now()
-            })
-
-        curr_year = datetime.now().year
-        if grad_year == str(curr_year):
-            alerts.append({
-                "organization": collection_name,
-                "member_name": member['Name'],
-                "alert_type": "graduation",
-                "details": {"Graduation Year": grad_year},
-                "timestamp": datetime.now()
-            })
-
-if alerts:
-    alerts_collection.insert_many(alerts)
\ No newline at end of file
+from components.indexes import COLLECTION_INDEXES, org_collection_name
+from components.mongo import get_sync_db
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
+
+LOW_GPA_THRESHOLD = 2.0
+ALERT_WORKERS = int(os.getenv("ALERT_WORKERS", "4"))
+
+# Per-org resume point: {"_id": org_name, "watermark": datetime, "year": int}
+STATE_COLLECTION = "alert_state"
+
+# Re-read a little before the watermark to tolerate clock skew between writers
+WATERMARK_OVERLAP = timedelta(seconds=int(os.getenv("ALERT_WATERMARK_OVERLAP", "60")))
+
+
+
+def alert_pipeline(org_name, run_id, year, changed=None):
+    """
+    Builds the aggregation that finds one org's alerting members on the
+    server and upserts their alerts with $merge, so only matching members
+    ever leave the collection scan and re-running is idempotent.
+
+    :param changed: Optional filter restricting evaluation to changed members.
+    """
+    def alert(alert_type, details):
+        return {
+            "organization_name": org_name,
+            "member_id": "$_id",
+            "member_name": {"$ifNull": ["$Name", "$name"]},
+            "alert_type": alert_type,
+            "details": details,
+            "timestamp": "$$NOW",
+            "run_id": run_id,
+        }
+
+    low_gpa = {"$and": [{"$ne": ["$_gpa", None]}, {"$lt": ["$_gpa", LOW_GPA_THRESHOLD]}]}
+    graduating = {"$in": ["$Graduation Year", [str(year), year]]}
+
+    return ([{"$match": changed}] if changed else []) + [
+        {"$set": {"_gpa": {"$convert": {"input": {"$ifNull": ["$GPA", "$gpa"]}, "to": "double", "onError": None, "onNull": None}}}},
+        {"$match": {"$expr": {"$or": [low_gpa, graduating]}}},
+        {"$project": {"_id": 0, "alerts": [
+            {"$cond": [low_gpa, alert("low_gpa", {"GPA": "$_gpa"}), None]},
+            {"$cond": [graduating, alert("graduation", {"Graduation Year": "$Graduation Year"}), None]},
+        ]}},
+        {"$unwind": "$alerts"},
+        {"$match": {"alerts": {"$ne": None}}},
+        {"$replaceWith": "$alerts"},
+        {"$merge": {
+            "into": "alerts",
+            "on": ["organization_name", "member_id", "alert_type"],
+            "whenMatched": "merge",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+def evaluate_org(db, org_name, full=False):
+    """
+    Refreshes one org's alerts and retires those whose condition no longer holds.
+
+    Only members whose ``updated_at`` is past the org's watermark are
+    re-evaluated. The first run, a new calendar year (the graduation rule
+    depends on it) or ``full=True`` re-evaluates the whole org, which also
+    clears alerts for members that were deleted.
+
+    :return: (org_name, members re-evaluated or None for a full run, alerts retired)
+    """
+    started = datetime.now(timezone.utc)
+    run_id = uuid.uuid4().hex
+    state = db[STATE_COLLECTION].find_one({"_id": org_name})
+    full = full or state is None or state.get("year") != started.year
+
+    if full:
+        db[org_name].aggregate(alert_pipeline(org_name, run_id, started.year))
+        retired = db["alerts"].delete_many({"organization_name": org_name, "run_id": {"$ne": run_id}})
+        evaluated = None
+    else:
+        changed = {"updated_at": {"$gt": state["watermark"].replace(tzinfo=timezone.utc) - WATERMARK_OVERLAP}}
+        changed_ids = [doc["_id"] for doc in db[org_name].find(changed, {"_id": 1})]
+        if changed_ids:
+            db[org_name].aggregate(alert_pipeline(org_name, run_id, started.year, {"_id": {"$in": changed_ids}}))
+        retired = db["alerts"].delete_many({
+            "organization_name": org_name,
+            "member_id": {"$in": changed_ids},
+            "run_id": {"$ne": run_id},
+        })
+        evaluated = len(changed_ids)
+
+    db[STATE_COLLECTION].update_one(
+        {"_id": org_name},
+        {"$set": {"watermark": started, "year": started.year}},
+        upsert=True,
+    )
+    return org_name, evaluated, retired.deleted_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh member alerts for every org")
+    parser.add_argument("--full", action="store_true", help="re-evaluate every member, not just changed ones")
+    args = parser.parse_args()
+
+    db = get_sync_db()
+
+    # Alerts from before the $merge rewrite have no member_id (and graduation
+    # alerts used "organization"); they would collide as null keys in the
+    # unique index that $merge needs. Removing any forces a full run, which
+    # recreates them in the current shape.
+    legacy = db["alerts"].delete_many({"$or": [
+        {"member_id": {"$exists": False}},
+        {"organization_name": {"$exists": False}},
+    ]})
+    full = args.full or legacy.deleted_count > 0
+    if legacy.deleted_count:
+        print(f"removed {legacy.deleted_count} legacy alerts")
+    db["alerts"].create_indexes(COLLECTION_INDEXES["alerts"])
+
+    org_names = [org_collection_name(doc["org_name"]) for doc in db["organizations"].find({}, {"org_name": 1})]
+
+    with ThreadPoolExecutor(max_workers=ALERT_WORKERS) as pool:
+        for org_name, evaluated, retired in pool.map(lambda name: evaluate_org(db, name, full), org_names):
+            scope = "all members" if evaluated is None else f"{evaluated} changed members"
+            print(f"{org_name}: evaluated {scope}, {retired} alerts retired")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,245 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import pandas as pd
+import argparse
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from dotenv import find_dotenv, load_dotenv
+import hashlib
+import json
 import os
+import random
+import time
+
+from components.bulk_writer import IngestStats
+from components.indexes import org_collection_name
+from components.member_import import build_column_map, load_schema_fields, map_rows
+from components.member_validator import get_validator
+from components.mongo import get_sync_db
+from components.org_schema import find_org_schema
+from csv_to_Mongo import write_in_chunks
+
+ENV_FILE = find_dotenv()
+if ENV_FILE:
+    load_dotenv(ENV_FILE)
 
 # Define scope
 scope = ["https://spreadsheets.google.com/feeds",
          "https://www.googleapis.com/auth/drive"]
 
-# Authentication with google sheets
-creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(creds)
+SYNC_WORKERS = int(os.getenv("SHEETS_SYNC_WORKERS", "8"))
+
+# Per-sheet resume point: {"_id": sheet_url, "org_name", "header", "row_count", "tail_hash", "synced_at"}
+SYNC_STATE_COLLECTION = "sheet_sync_state"
+
+# Already-synced rows re-read on each run to detect edits or deletions above the new range
+SYNC_TAIL_ROWS = int(os.getenv("SHEETS_SYNC_TAIL_ROWS", "5"))
+
+
+def authorize(credentials_path="credentials.json"):
+    """
+    Authenticates with Google Sheets using a service account key file.
+    """
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_path, scope)
+    return gspread.authorize(creds)
+
+
+def with_retry(fetch, attempts=5, base_delay=1.0):
+    """
+    Calls ``fetch`` and retries failures (Sheets API quota errors, dropped
+    connections) with exponential backoff and jitter.
+    """
+    for attempt in range(attempts):
+        try:
+            return fetch()
+        except Exception as e:
+            if attempt == attempts - 1:
+                raise
+            delay = base_delay * 2 ** attempt * (1 + random.random())
+            print(f"Sheets request failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def write_csv_artifact(csv_dir, organization_name, header, rows):
+    """
+    Optionally keeps a CSV copy of the responses, as the sync used to.
+    """
+    os.makedirs(csv_dir, exist_ok=True)
+    output_path = os.path.join(csv_dir, f"{organization_name}.csv")
+    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def column_letter(index):
+    """
+    Converts a 1-based column index to its A1 letters (1 -> A, 27 -> AA).
+    """
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def normalize_row(row):
+    # The Sheets API drops trailing empty cells, so compare rows without them
+    row = [str(value) for value in row]
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+def rows_hash(rows):
+    payload = json.dumps([normalize_row(row) for row in rows], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fetch_new_rows(worksheet, state):
+    """
+    Fetches the header and every row from the last synced tail onward in one
+    batched read, and returns only the rows past the synced range. Returns
+    None when the header or the re-read tail no longer match the saved state
+    (rows were edited, inserted or deleted), meaning a full resync is needed.
+    """
+    header = state["header"]
+    synced = state["row_count"]
+    if not header:
+        return None
+    tail_start = max(synced - SYNC_TAIL_ROWS, 0)
 
-# List of organizations and their sheets
-list_organizations = "link to google drive page" # nvm, not using google drive
-organizations = client.open_by_url(list_organizations).worksheet("Form Responses 1")
+    # Row 1 is the header, so data row i lives on sheet row i + 2
+    header_values, body = with_retry(lambda: worksheet.batch_get(
+        ["1:1", f"A{tail_start + 2}:{column_letter(len(header))}"]
+    ))
+    if not header_values or normalize_row(header_values[0]) != normalize_row(header):
+        return None
 
-organization_data = organizations.get_all_records()
+    tail = list(body[:synced - tail_start])
+    if len(tail) != synced - tail_start or rows_hash(tail) != state["tail_hash"]:
+        return None
+    return tail, list(body[len(tail):])
 
-# Folder to store csv files
-os.makedirs("organizations", exist_ok=True)
 
-for organization in organization_data:
+def to_records(header, rows):
+    return [dict(zip(header, list(row) + [""] * (len(header) - len(row)))) for row in rows]
+
+
+def sync_organization(client, db, organization, fields, csv_dir=None, chunk_size=1000, full=False):
+    """
+    Syncs one organization's responses sheet into its collection, keyed on email.
+
+    Form-response sheets are mostly append-only, so after the first run only
+    rows past the saved ``row_count`` are fetched and inserted. A full read
+    happens on the first run, with ``full=True``, when the header or the
+    last synced rows changed, or when a CSV copy is requested; it applies
+    every row with overwrite, so edited rows update their members (and
+    ``updated_at``) while unchanged rows are left as they are.
+
+    Rows are validated against the org's stored schema, or ``fields`` when
+    it has none.
+
+    :return: (organization name, IngestStats, whether the whole sheet was read)
+    """
     organization_name = organization["Organization Name"]
     sheet_url = organization["Sheet URL"]
-    output_csv = f"{organization_name}.csv"
+    state_collection = db[SYNC_STATE_COLLECTION]
 
     # Individually open each organization's google sheets link
-    sheet = client.open_by_url(sheet_url).sheet1
+    worksheet = with_retry(lambda: client.open_by_url(sheet_url).sheet1)
+
+    state = None if full or csv_dir else state_collection.find_one({"_id": sheet_url})
+    fetched = fetch_new_rows(worksheet, state) if state else None
+
+    if fetched is None:
+        values = with_retry(worksheet.get_values)
+        header, rows = (values[0], values[1:]) if values else ([], [])
+        tail, synced = [], 0
+    else:
+        header = state["header"]
+        tail, rows = fetched
+        synced = state["row_count"]
+
+    schema = find_org_schema(db, organization_name)
+    if schema is not None:
+        fields = schema.fields
+    stats = IngestStats()
+    validator = get_validator(fields, schema.version if schema else None)
+    column_map = build_column_map(header, fields)
+    mapped = map_rows(to_records(header, rows), column_map, validator, stats, first_row_number=synced + 2)
+    write_in_chunks(
+        mapped, db[org_collection_name(organization_name)], "email", chunk_size, stats, overwrite=fetched is None
+    )
+
+    if csv_dir:
+        write_csv_artifact(csv_dir, organization_name, header, rows)
+
+    state_collection.update_one(
+        {"_id": sheet_url},
+        {"$set": {
+            "org_name": organization_name,
+            "header": header,
+            "row_count": synced + len(rows),
+            "tail_hash": rows_hash((tail + rows)[-SYNC_TAIL_ROWS:]),
+            "synced_at": datetime.now(timezone.utc),
+        }},
+        upsert=True,
+    )
+    return organization_name, stats, fetched is None
+
+
+def sync_all(client, db, list_url, fields, workers=SYNC_WORKERS, csv_dir=None, full=False):
+    """
+    Syncs every organization listed in the form-responses sheet at
+    ``list_url``, fetching up to ``workers`` sheets concurrently.
+
+    ``client`` only needs ``open_by_url``, so tests can pass a fake gspread client.
+    """
+    organizations = with_retry(
+        lambda: client.open_by_url(list_url).worksheet("Form Responses 1").get_all_records()
+    )
+
+    def sync(organization):
+        try:
+            return sync_organization(client, db, organization, fields, csv_dir, full=full)
+        except Exception as e:
+            print(f"Failed to sync {organization.get('Organization Name')}: {e}")
+            return organization.get("Organization Name"), None, None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(sync, organizations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync every organization's Google Sheet into MongoDB")
+    parser.add_argument("--list-url", default=os.getenv("ORG_SHEET_LIST_URL"),
+                        help="sheet listing organizations and their sheet URLs")
+    parser.add_argument("--credentials", default="credentials.json")
+    parser.add_argument("--schema", default="schema.json", help="fields for orgs without a stored schema")
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS)
+    parser.add_argument("--csv-dir", help="also save each organization's responses as CSV here (implies --full)")
+    parser.add_argument("--full", action="store_true", help="re-read every sheet instead of only new rows")
+    args = parser.parse_args()
+
+    if not args.list_url:
+        parser.error("--list-url or ORG_SHEET_LIST_URL is required")
 
-    # Get data and save to CSV
-    data = sheet.get_all_records()
-    df = pd.DataFrame(data)
+    results = sync_all(
+        authorize(args.credentials),
+        get_sync_db(),
+        args.list_url,
+        load_schema_fields(args.schema),
+        workers=args.workers,
+        csv_dir=args.csv_dir,
+        full=args.full,
+    )
+    for organization_name, stats, full_read in results:
+        if stats:
+            scope = "full sheet" if full_read else "new rows"
+            print(f"{organization_name} ({scope}): {stats.summary()}")
 
-    output_path = os.path.join("organizations", output_csv)
-    df.to_csv(output_path, index=False)
 
-    print(f"{organization_name} responses saved to {output_csv}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Local stand-in for the Auth0 tenant endpoints used by the API (JWKS, OIDC
+metadata, client-credentials tokens and the Management API subset we call),
+so auth can be benchmarked without network access. Signs test tokens with a
+throwaway RSA key.
+"""
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Header, HTTPException, Request
+from jose import jwk, jwt
+
+
+class SigningKey:
+    def __init__(self, kid="standin-key"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = kid
+        self.private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public = jwk.construct(self.private_pem, "RS256").public_key().to_dict()
+        self.public_jwk = {**public, "kid": kid, "use": "sig"}
+
+    def sign(self, claims, ttl=3600):
+        now = int(time.time())
+        claims = {"iat": now, "exp": now + ttl, **claims}
+        return jwt.encode(claims, self.private_pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+def create_app(keys, issuer, token_ttl=86400):
+    """
+    Builds the stand-in app. ``app.state.hits`` counts requests per path and
+    ``app.state.users`` / ``app.state.orgs`` hold Management API state.
+    """
+    app = FastAPI()
+    app.state.hits = {}
+    app.state.tokens = set()
+    app.state.users = {}
+    app.state.orgs = {}
+
+    def check_token(authorization):
+        if not authorization or authorization.removeprefix("Bearer ") not in app.state.tokens:
+            raise HTTPException(status_code=401, detail="Invalid token")
+
+    @app.middleware("http")
+    async def count_hits(request, call_next):
+        app.state.hits[request.url.path] = app.state.hits.get(request.url.path, 0) + 1
+        return await call_next(request)
+
+    @app.get("/.well-known/jwks.json")
+    async def jwks():
+        return {"keys": [key.public_jwk for key in keys]}
+
+    @app.get("/.well-known/openid-configuration")
+    async def openid_configuration():
+        return {
+            "issuer": issuer,
+            "jwks_uri": f"{issuer}.well-known/jwks.json",
+            "authorization_endpoint": f"{issuer}authorize",
+            "token_endpoint": f"{issuer}oauth/token",
+        }
+
+    @app.post("/oauth/token")
+    async def oauth_token():
+        token = secrets.token_urlsafe(16)
+        app.state.tokens.add(token)
+        return {"access_token": token, "expires_in": token_ttl, "token_type": "Bearer"}
+
+    @app.get("/api/v2/users/{user_id}")
+    async def get_user(user_id: str, authorization: str = Header(default=None)):
+        check_token(authorization)
+        return app.state.users.setdefault(user_id, {"user_id": user_id, "user_metadata": {}})
+
+    @app.patch("/api/v2/users/{user_id}")
+    async def update_user(user_id: str, request: Request, authorization: str = Header(default=None)):
+        check_token(authorization)
+        user = app.state.users.setdefault(user_id, {"user_id": user_id, "user_metadata": {}})
+        user.update(await request.json())
+        return user
+
+    @app.post("/api/v2/organizations", status_code=201)
+    async def create_organization(request: Request, authorization: str = Header(default=None)):
+        check_token(authorization)
+        body = await request.json()
+        if body["name"] in app.state.orgs:
+            raise HTTPException(status_code=409, detail="Organization already exists")
+        org = {"id": f"org_{secrets.token_hex(8)}", "members": [], **body}
+        app.state.orgs[body["name"]] = org
+        return org
+
+    @app.get("/api/v2/organizations/name/{name}")
+    async def get_organization_by_name(name: str, authorization: str = Header(default=None)):
+        check_token(authorization)
+        if name not in app.state.orgs:
+            raise HTTPException(status_code=404, detail="Not found")
+        return app.state.orgs[name]
+
+    @app.post("/api/v2/organizations/{org_id}/members", status_code=204)
+    async def add_organization_members(org_id: str, request: Request, authorization: str = Header(default=None)):
+        check_token(authorization)
+        org = next(org for org in app.state.orgs.values() if org["id"] == org_id)
+        org["members"].extend((await request.json())["members"])
+
+    return app
+
+
+@contextmanager
+def serve(app, port=8765):
+    """
+    Runs ``app`` on localhost in a background thread for the duration of the block.
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
@@ -0,0 +1,64 @@
+"""
+Compares Auth0 Management API calls that fetch a fresh client-credentials
+token each time (the old per-route behaviour) with the shared
+Auth0ManagementClient, against the local Auth0 stand-in.
+
+Usage:
+    python benchmarks/bench_auth0_mgmt.py --requests 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+from auth_standin import SigningKey, create_app, serve
+from components.auth0_mgmt import Auth0ManagementClient
+
+DOMAIN = "standin.local"
+
+
+async def uncached_update(base_url, user_id):
+    async with httpx.AsyncClient(base_url=base_url) as http:
+        token = (await http.post("/oauth/token", json={"grant_type": "client_credentials"})).json()["access_token"]
+        response = await http.patch(
+            f"/api/v2/users/{user_id}",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"nickname": "bench"},
+        )
+        response.raise_for_status()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    app = create_app([SigningKey()], f"https://{DOMAIN}/")
+    with serve(app, args.port) as base_url:
+        start = time.perf_counter()
+        await asyncio.gather(*(uncached_update(base_url, f"auth0|{i}") for i in range(args.requests)))
+        uncached = time.perf_counter() - start
+        uncached_tokens = app.state.hits["/oauth/token"]
+
+        client = Auth0ManagementClient(DOMAIN, "id", "secret", base_url=base_url)
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.update_user(f"auth0|{i}", {"nickname": "bench"}) for i in range(args.requests))
+        )
+        cached = time.perf_counter() - start
+        cached_tokens = app.state.hits["/oauth/token"] - uncached_tokens
+        assert all(response.is_success for response in responses)
+        await client.aclose()
+
+    print(f"token per call         : {args.requests / uncached:8.1f} calls/s ({uncached_tokens} token requests)")
+    print(f"Auth0ManagementClient  : {args.requests / cached:8.1f} calls/s ({cached_tokens} token requests)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Micro-benchmark of verify_access_token with and without the verified-claims
+cache, using tokens signed locally and a local JWKS stand-in.
+
+Usage:
+    python benchmarks/bench_auth_cache.py --iterations 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from auth_standin import SigningKey, create_app, serve
+
+ISSUER_DOMAIN = "standin.local"
+AUDIENCE = "https://api.fastorg.test"
+
+
+async def time_verify(mainapi, token, iterations, cached):
+    await mainapi.verify_access_token(token)  # warm the JWKS cache
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            mainapi.claims_cache.clear()
+        await mainapi.verify_access_token(token)
+    return (time.perf_counter() - start) / iterations
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    key = SigningKey()
+    token = key.sign({"sub": "auth0|bench", "aud": AUDIENCE, "iss": f"https://{ISSUER_DOMAIN}/"})
+
+    with serve(create_app([key], f"https://{ISSUER_DOMAIN}/"), args.port) as base_url:
+        os.environ.update(AUTH0_BASE_URL=base_url, AUTH0_DOMAIN=ISSUER_DOMAIN, AUTH0_AUDIENCE=AUDIENCE)
+        os.environ.setdefault("APP_SECRET_KEY", "bench")
+        import mainapi
+
+        uncached = await time_verify(mainapi, token, args.iterations, cached=False)
+        cached = await time_verify(mainapi, token, args.iterations, cached=True)
+
+    print(f"RS256 verify every time : {uncached * 1e6:10.1f} us/request")
+    print(f"verified-claims cache   : {cached * 1e6:10.1f} us/request")
+    print(f"speedup                 : {uncached / cached:10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
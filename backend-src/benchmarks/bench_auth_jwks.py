@@ -0,0 +1,69 @@
+"""
+Measures per-request auth overhead of downloading the JWKS on every request
+(the old require_auth behaviour) against the in-process JWKSCache, using a
+local JWKS stand-in.
+
+Usage:
+    python benchmarks/bench_auth_jwks.py --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jose import jwt
+
+from auth_standin import SigningKey, create_app, serve
+from components.jwks_cache import JWKSCache
+
+ISSUER = "https://standin.local/"
+AUDIENCE = "https://api.fastorg.test"
+
+
+def uncached_verify(base_url, token):
+    jwks = json.loads(urlopen(f"{base_url}/.well-known/jwks.json").read())
+    kid = jwt.get_unverified_header(token)["kid"]
+    rsa_key = next(key for key in jwks["keys"] if key["kid"] == kid)
+    return jwt.decode(token, rsa_key, algorithms=["RS256"], audience=AUDIENCE, issuer=ISSUER)
+
+
+async def cached_verify(cache, token):
+    key = await cache.get_signing_key(jwt.get_unverified_header(token)["kid"])
+    return jwt.decode(token, key, algorithms=["RS256"], audience=AUDIENCE, issuer=ISSUER)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    key = SigningKey()
+    token = key.sign({"sub": "auth0|bench", "aud": AUDIENCE, "iss": ISSUER})
+    app = create_app([key], ISSUER)
+
+    with serve(app, args.port) as base_url:
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            await asyncio.to_thread(uncached_verify, base_url, token)
+        uncached = (time.perf_counter() - start) / args.requests
+        uncached_hits = app.state.hits.get("/.well-known/jwks.json", 0)
+
+        cache = JWKSCache(base_url)
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            await cached_verify(cache, token)
+        cached = (time.perf_counter() - start) / args.requests
+        cached_hits = app.state.hits.get("/.well-known/jwks.json", 0) - uncached_hits
+
+    print(f"fetch JWKS per request : {uncached * 1000:8.3f} ms/request ({uncached_hits} JWKS downloads)")
+    print(f"JWKSCache              : {cached * 1000:8.3f} ms/request ({cached_hits} JWKS downloads)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Measures /protected/members/bulk ingestion throughput by driving the same
+parse -> validate -> bulk upsert pipeline over a synthetic NDJSON or CSV
+body, chunked like a streamed request. Pass --dry-run to skip the database
+and measure the parse/validate ceiling.
+
+Usage (against a local mongod):
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_bulk_import.py --rows 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.bulk_writer import IngestStats
+from components.member_import import ingest_rows, iter_csv_rows, iter_lines, iter_ndjson_rows
+from components.member_validator import get_validator
+from components.mongo import MONGO_DB_NAME, create_async_client
+from components.org_schema import load_default_schema
+
+BENCH_COLLECTION = "bench_bulk_import"
+CHUNK_BYTES = 64 * 1024
+
+
+def build_body(rows, format):
+    members = [
+        {
+            "name": f"Member {n}",
+            "class": "Junior",
+            "gpa": f"{1.5 + (n % 26) / 10:.1f}",
+            "major": "Computer Science",
+            "grad": "5/8/2026",
+            "email": f"member{n}@bench.example",
+        }
+        for n in range(rows)
+    ]
+    if format == "ndjson":
+        text = "".join(json.dumps(member) + "\n" for member in members)
+    else:
+        header = list(members[0])
+        text = ",".join(header) + "\n" + "".join(",".join(member[h] for h in header) + "\n" for member in members)
+    return text.encode()
+
+
+async def chunks(body):
+    for start in range(0, len(body), CHUNK_BYTES):
+        yield body[start:start + CHUNK_BYTES]
+
+
+class NullCollection:
+    async def bulk_write(self, ops, ordered=True):
+        class Result:
+            bulk_api_result = {"nUpserted": len(ops)}
+        return Result()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="skip MongoDB writes")
+    args = parser.parse_args()
+
+    org_schema = load_default_schema(os.path.join(os.path.dirname(__file__), "..", "schema.json"))
+    validator = get_validator(org_schema.fields, org_schema.version)
+    body = build_body(args.rows, args.format)
+
+    client = None
+    if args.dry_run:
+        collection = NullCollection()
+    else:
+        client = create_async_client()
+        collection = client[MONGO_DB_NAME][BENCH_COLLECTION]
+        await collection.drop()
+        await collection.create_index("email", unique=True)
+
+    lines = iter_lines(chunks(body))
+    rows = iter_csv_rows(lines, org_schema.fields) if args.format == "csv" else iter_ndjson_rows(lines)
+    stats = IngestStats()
+    start = time.perf_counter()
+    await ingest_rows(rows, collection, validator, stats, args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.format}, {len(body) / 1e6:.1f} MB body: {stats.summary()}")
+    print(f"{args.rows / elapsed:,.0f} rows/s end to end")
+
+    if client is not None:
+        await client[MONGO_DB_NAME][BENCH_COLLECTION].drop()
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
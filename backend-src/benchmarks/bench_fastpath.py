@@ -0,0 +1,77 @@
+"""
+Measures how much of a prompt corpus the rule-based fast path answers
+without the LLM, how long parsing takes, and the LLM latency it saves.
+
+A corpus line may end in ``=> <filter JSON>`` or ``=> LLM`` to pin what the
+fast path must return for it; a mismatch fails the run.
+
+Usage:
+    python benchmarks/bench_fastpath.py --llm-latency 1.2 [--show-misses]
+Exits with status 1 when a pinned prompt parses differently.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.nl_fastpath import parse_prompt
+from components.org_schema import load_default_schema
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+UNPINNED = object()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=os.path.join(HERE, "fastpath_corpus.txt"))
+    parser.add_argument("--schema", default=os.path.join(HERE, "..", "schema.json"))
+    parser.add_argument("--llm-latency", type=float, default=1.2, help="mean /generate-mql LLM latency in seconds")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+
+    org_schema = load_default_schema(args.schema)
+    expected = {}
+    with open(args.corpus, encoding="utf-8") as corpus:
+        for line in corpus:
+            if not line.strip() or line.startswith("#"):
+                continue
+            prompt, _, pinned = (part.strip() for part in line.partition("=>"))
+            expected[prompt] = (None if pinned == "LLM" else json.loads(pinned)) if pinned else UNPINNED
+    prompts = list(expected)
+
+    results = {prompt: parse_prompt(prompt, org_schema) for prompt in prompts}
+    covered = [prompt for prompt, query in results.items() if query is not None]
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for prompt in prompts:
+            parse_prompt(prompt, org_schema)
+    per_prompt = (time.perf_counter() - start) / (args.repeat * len(prompts))
+
+    print(f"coverage      : {len(covered)}/{len(prompts)} prompts ({len(covered) / len(prompts):.0%})")
+    print(f"parse time    : {per_prompt * 1e6:.1f} us/prompt")
+    print(f"latency saved : {len(covered) * args.llm_latency:.1f} s over the corpus "
+          f"({len(covered) / len(prompts) * args.llm_latency * 1000:.0f} ms/request on average)")
+    for prompt in prompts:
+        if results[prompt] is not None:
+            print(f"  {prompt!r:60} -> {results[prompt]}")
+        elif args.show_misses:
+            print(f"  {prompt!r:60} -> (LLM)")
+
+    mismatches = [
+        prompt for prompt, pinned in expected.items()
+        if pinned is not UNPINNED and (json.loads(results[prompt]) if results[prompt] else None) != pinned
+    ]
+    for prompt in mismatches:
+        print(f"MISMATCH {prompt!r}: expected {json.dumps(expected[prompt]) if expected[prompt] else 'LLM'}, "
+              f"got {results[prompt] or 'LLM'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares a new blocking OpenAI client per request (the old /generate-mql
+behaviour) with the shared async LLMClient, against a local stand-in that
+returns canned completions after --delay seconds.
+
+Usage:
+    python benchmarks/bench_llm_client.py --requests 20 --delay 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from openai import OpenAI
+
+from auth_standin import serve
+from openai_standin import create_app
+from components.llm_client import LLMClient
+
+MESSAGES = [{"role": "user", "content": "Generate MongoDB query for: members with GPA below 2.0"}]
+
+
+async def blocking_request(base_url):
+    client = OpenAI(api_key="standin", base_url=base_url)
+    client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+
+
+async def timed(app, coroutines):
+    calls_before = app.state.calls
+    start = time.perf_counter()
+    await asyncio.gather(*coroutines)
+    return time.perf_counter() - start, app.state.calls - calls_before
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    app = create_app(delay=args.delay)
+    with serve(app, args.port) as url:
+        base_url = f"{url}/v1"
+        llm = LLMClient(api_key="standin", base_url=base_url, max_concurrency=args.concurrency)
+
+        results = {
+            "blocking client per request": await timed(app, [blocking_request(base_url) for _ in range(args.requests)]),
+            "shared async client, distinct prompts": await timed(
+                app, [llm.complete(MESSAGES, coalesce_key=i) for i in range(args.requests)]
+            ),
+            "shared async client, identical prompts": await timed(
+                app, [llm.complete(MESSAGES, coalesce_key="same") for _ in range(args.requests)]
+            ),
+        }
+        await llm.aclose()
+
+    for name, (elapsed, calls) in results.items():
+        print(f"{name:40s}: {elapsed:6.2f} s for {args.requests} requests, {calls} upstream calls")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
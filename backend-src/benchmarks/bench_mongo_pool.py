@@ -0,0 +1,73 @@
+"""
+Compares invite-code lookups per second between the old pattern (a fresh
+sync MongoClient per request, blocking the event loop) and the shared pooled
+async client.
+
+Usage (against a local mongod):
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_mongo_pool.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pymongo import MongoClient
+
+from components.mongo import MONGO_DB_NAME, create_async_client, get_mongo_uri
+
+BENCH_CODE = "bench-invite"
+
+
+async def old_lookup(uri):
+    # Mirrors the per-handler pattern: connect, query, close, all blocking
+    client = MongoClient(uri)
+    try:
+        client[MONGO_DB_NAME]["organizations"].find_one({"invite_code": BENCH_CODE})
+    finally:
+        client.close()
+
+
+async def run(lookup, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await lookup()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    uri = get_mongo_uri()
+    client = create_async_client(uri)
+    orgs = client[MONGO_DB_NAME]["organizations"]
+    await orgs.update_one(
+        {"invite_code": BENCH_CODE},
+        {"$set": {"org_name": "bench_org", "invite_code": BENCH_CODE}},
+        upsert=True,
+    )
+
+    try:
+        before = await run(lambda: old_lookup(uri), args.requests, args.concurrency)
+        after = await run(lambda: orgs.find_one({"invite_code": BENCH_CODE}), args.requests, args.concurrency)
+    finally:
+        await orgs.delete_one({"invite_code": BENCH_CODE})
+        await client.close()
+
+    print(f"client per request : {before:10.1f} req/s")
+    print(f"shared async pool  : {after:10.1f} req/s")
+    print(f"speedup            : {after / before:10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Compares the streamed JSON roster with the Parquet, Arrow and CSV exports
+for a synthetic org: bytes on the wire, time, and peak traced memory.
+Members come from an in-memory async iterator, so no mongod is needed.
+
+Usage:
+    python benchmarks/bench_roster_export.py --members 100000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.org_schema import load_default_schema
+from components.roster import dump_member
+from components.roster_export import EXPORT_FORMATS, stream_export
+
+MAJORS = ["Computer Science", "Mathematics", "Biology", "Economics", "Physics"]
+
+
+class SyntheticCursor:
+    def __init__(self, count):
+        self.count = count
+
+    async def _members(self):
+        for n in range(self.count):
+            yield {
+                "_id": n,
+                "name": f"Member {n}",
+                "class": ["Freshman", "Sophomore", "Junior", "Senior"][n % 4],
+                "gpa": round(1.5 + (n % 26) / 10, 1),
+                "major": MAJORS[n % len(MAJORS)],
+                "grad": f"May {2026 + n % 4}",
+                "email": f"member{n}@bench.example",
+            }
+
+    def __aiter__(self):
+        return self._members()
+
+
+async def json_stream(members):
+    # Same framing as get_roster's full-roster stream
+    yield b'{"organization": "bench", "roster": ['
+    separator = b""
+    async for member in members:
+        yield separator + dump_member(member).encode()
+        separator = b", "
+    yield b"]}"
+
+
+async def measure(label, stream):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = 0
+    async for chunk in stream:
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>8}: {size / 1e6:8.2f} MB in {elapsed:5.2f}s, peak {peak / 1e6:6.1f} MB traced")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=100000)
+    args = parser.parse_args()
+
+    org_schema = load_default_schema(os.path.join(os.path.dirname(__file__), "..", "schema.json"))
+    field_names = [field["name"] for field in org_schema.fields]
+
+    await measure("json", json_stream(SyntheticCursor(args.members)))
+    for format in EXPORT_FORMATS:
+        await measure(format, stream_export(SyntheticCursor(args.members), format, org_schema, field_names))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
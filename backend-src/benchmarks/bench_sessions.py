@@ -0,0 +1,91 @@
+"""
+Compares per-request session overhead of the signed-cookie SessionMiddleware
+with ServerSessionMiddleware (memory and, with --mongo, MongoDB stores with
+and without the per-worker cache) on a minimal app whose handler only reads
+``request.session["user"]``, using a session shaped like the one /callback
+and fetch_full_profile build.
+
+Usage:
+    python benchmarks/bench_sessions.py --requests 5000
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_sessions.py --mongo
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.sessions import SessionMiddleware
+
+from components.mongo import MONGO_DB_NAME, create_async_client
+from components.sessions import CachedSessionStore, MemorySessionStore, MongoSessionStore, ServerSessionMiddleware
+
+
+def fat_session():
+    return {
+        "user": {
+            "sub": "auth0|" + secrets.token_hex(12),
+            "name": "Bench User",
+            "nickname": "bench",
+            "email": "bench@example.com",
+            "picture": "https://s.gravatar.com/avatar/" + secrets.token_hex(16),
+            "user_metadata": {"org_name": "Bench Org", "setup_complete": True, "role": "officer"},
+        },
+        # Roughly the size of an Auth0 RS256 access token
+        "access_token": secrets.token_urlsafe(600),
+    }
+
+
+def create_app(middleware, **options):
+    app = FastAPI()
+    app.add_middleware(middleware, **options)
+
+    @app.post("/login")
+    async def login(request: Request):
+        request.session.update(fat_session())
+        return {}
+
+    @app.get("/me")
+    async def me(request: Request):
+        return {"sub": request.session["user"]["sub"]}
+
+    return app
+
+
+async def measure(label, app, requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/login")
+        cookie = "; ".join(f"{name}={value}" for name, value in client.cookies.items())
+        start = time.perf_counter()
+        for _ in range(requests):
+            (await client.get("/me")).raise_for_status()
+        elapsed = time.perf_counter() - start
+    print(f"{label:>16}: {elapsed / requests * 1e6:7.0f} us/request, cookie {len(cookie)} bytes")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--mongo", action="store_true", help="also measure the MongoDB store")
+    args = parser.parse_args()
+
+    await measure("signed cookie", create_app(SessionMiddleware, secret_key="bench"), args.requests)
+    await measure("server, memory", create_app(ServerSessionMiddleware, store=MemorySessionStore()), args.requests)
+
+    if args.mongo:
+        client = create_async_client()
+        store = MongoSessionStore(lambda: client[MONGO_DB_NAME])
+        await measure("server, mongo", create_app(ServerSessionMiddleware, store=store), args.requests)
+        cached = CachedSessionStore(store)
+        await measure("server, cached", create_app(ServerSessionMiddleware, store=cached), args.requests)
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Compares the old one-sheet-at-a-time sync with the concurrent sync_all
+against an in-process fake gspread client whose reads take --latency
+seconds, then re-syncs after --new-rows responses per org to show the
+incremental path. Writes go to a local mongod, one collection per bench org.
+
+Usage (against a local mongod):
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_sheets_sync.py --orgs 40
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from automate_csv import SYNC_STATE_COLLECTION, sync_all, sync_organization
+from components.indexes import org_collection_name
+from components.member_import import load_schema_fields
+from components.mongo import get_sync_db
+from fake_gspread import FakeClient, build_sheets
+
+LIST_URL = "https://sheets.example/list"
+
+
+def sequential(client, db, fields):
+    organizations = client.open_by_url(LIST_URL).worksheet("Form Responses 1").get_all_records()
+    return [sync_organization(client, db, organization, fields, full=True) for organization in organizations]
+
+
+def add_responses(sheets, count):
+    for url, worksheets in sheets.items():
+        if url == LIST_URL:
+            continue
+        rows = next(iter(worksheets.values()))
+        for n in range(count):
+            rows.append(dict(rows[0], **{"Email Address": f"new{len(rows)}-{n}@bench.example"}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orgs", type=int, default=40)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--new-rows", type=int, default=3)
+    args = parser.parse_args()
+
+    db = get_sync_db()
+    fields = load_schema_fields(os.path.join(os.path.dirname(__file__), "..", "schema.json"))
+    sheets = build_sheets(args.orgs, args.rows, LIST_URL)
+
+    def reset():
+        for org in range(args.orgs):
+            db.drop_collection(org_collection_name(f"Bench Org {org}"))
+        db[SYNC_STATE_COLLECTION].delete_many({"org_name": {"$regex": "^Bench Org "}})
+
+    def timed(label, run):
+        client = FakeClient(sheets, latency=args.latency)
+        start = time.perf_counter()
+        results = run(client)
+        elapsed = time.perf_counter() - start
+        inserted = sum(stats.inserted for _, stats, _ in results if stats)
+        print(f"{label:>28}: {elapsed:6.2f}s, {client.calls} sheet reads, "
+              f"{client.rows_read} rows fetched, {inserted} members inserted")
+
+    def concurrent(client):
+        return sync_all(client, db, LIST_URL, fields, workers=args.workers)
+
+    reset()
+    timed("sequential, full", lambda client: sequential(client, db, fields))
+    reset()
+    timed(f"concurrent ({args.workers} workers), full", concurrent)
+    add_responses(sheets, args.new_rows)
+    timed(f"concurrent, +{args.new_rows} rows/org", concurrent)
+    reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures member validation throughput: the old join-org check (rebuild
+required_fields from the schema document per request, presence only)
+against the compiled MemberValidator, which also coerces types, fetched
+through get_validator as join-org does.
+
+Usage:
+    python benchmarks/bench_validation.py --members 200000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from components.member_validator import get_validator
+from components.org_schema import schema_version
+
+
+def old_check(schema_doc, data):
+    required_fields = [field["name"] for field in schema_doc["fields"] if field.get("required")]
+    for field in required_fields:
+        if field not in data or not data[field]:
+            raise ValueError(f"Missing required field: {field}")
+    return data
+
+
+def members(count):
+    return [
+        {
+            "name": f" Member {n} ",
+            "class": "Junior",
+            "gpa": f"{1.5 + (n % 26) / 10:.1f}",
+            "major": "Computer Science",
+            "grad": "5/8/2026",
+            "email": f"member{n}@bench.example",
+            "shirt": "M",
+        }
+        for n in range(count)
+    ]
+
+
+def measure(label, check, rows):
+    start = time.perf_counter()
+    for row in rows:
+        check(row)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>30}: {len(rows) / elapsed:>10,.0f} members/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=200000)
+    args = parser.parse_args()
+
+    with open(os.path.join(os.path.dirname(__file__), "..", "schema.json"), encoding="utf-8") as f:
+        schema_doc = json.load(f)
+    fields = schema_doc["fields"]
+    version = schema_version(fields)
+    rows = members(args.members)
+
+    measure("old presence check", lambda row: old_check(schema_doc, row), rows)
+    measure("compiled validator (cached)", lambda row: get_validator(fields, version).validate(row), rows)
+    validator = get_validator(fields, version)
+    measure("compiled validator (held)", validator.validate, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+In-process stand-in for the slice of the gspread client the Sheets sync
+uses. Every sheet read sleeps for ``latency`` seconds to model the Sheets
+API round trip; ``calls`` counts reads and ``rows_read`` the rows returned.
+"""
+import re
+import threading
+import time
+
+ROW_RANGE = re.compile(r"^[A-Z]*(\d*):[A-Z]*(\d*)$")
+
+
+class FakeWorksheet:
+    def __init__(self, client, rows):
+        self.client = client
+        self.rows = rows
+
+    def _grid(self):
+        # Formatted values, as the Sheets API returns them
+        header = list(self.rows[0].keys()) if self.rows else []
+        return [header] + [[str(row.get(column, "")) for column in header] for row in self.rows]
+
+    def _read(self, rows):
+        self.client.record_call(len(rows))
+        time.sleep(self.client.latency)
+        return rows
+
+    def get_all_records(self):
+        return self._read([dict(row) for row in self.rows])
+
+    def get_values(self):
+        return self._read(self._grid())
+
+    def batch_get(self, ranges):
+        """
+        Supports the row ranges the sync uses: "1:1" and open-ended "A5:F".
+        """
+        grid = self._grid()
+        results = []
+        for a1 in ranges:
+            start, end = ROW_RANGE.match(a1).groups()
+            results.append(grid[int(start) - 1:int(end) if end else None])
+        self.client.record_call(sum(len(rows) for rows in results))
+        time.sleep(self.client.latency)
+        return results
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, worksheets):
+        self.client = client
+        self.worksheets = worksheets
+
+    @property
+    def sheet1(self):
+        return FakeWorksheet(self.client, next(iter(self.worksheets.values())))
+
+    def worksheet(self, title):
+        return FakeWorksheet(self.client, self.worksheets[title])
+
+
+class FakeClient:
+    """
+    ``sheets`` maps a sheet URL to ``{worksheet title: [record dict, ...]}``;
+    the first worksheet is ``sheet1``. Append to the record lists to model
+    new form responses.
+    """
+
+    def __init__(self, sheets, latency=0.2):
+        self.sheets = sheets
+        self.latency = latency
+        self.calls = 0
+        self.rows_read = 0
+        self._lock = threading.Lock()
+
+    def record_call(self, rows=0):
+        with self._lock:
+            self.calls += 1
+            self.rows_read += rows
+
+    def open_by_url(self, url):
+        return FakeSpreadsheet(self, self.sheets[url])
+
+
+def build_sheets(org_count, rows_per_org, list_url="https://sheets.example/list"):
+    """
+    Builds an org list sheet plus one responses sheet per org, with
+    form-question headers like the real Google Form exports.
+    """
+    organizations = []
+    sheets = {}
+    for org in range(org_count):
+        url = f"https://sheets.example/org-{org}"
+        organizations.append({"Organization Name": f"Bench Org {org}", "Sheet URL": url})
+        sheets[url] = {"Form Responses 1": [
+            {
+                "Timestamp": "1/1/2026 12:00:00",
+                "Enter your name": f"Member {row}",
+                "Year/Class": "Junior",
+                "GPA": round(1.5 + (row % 25) / 10, 1),
+                "Major": "Computer Science",
+                "Expected Graduating Date": "May 2027",
+                "Email Address": f"member{row}@org{org}.example",
+            }
+            for row in range(rows_per_org)
+        ]}
+    sheets[list_url] = {"Form Responses 1": organizations}
+    return sheets
@@ -0,0 +1,102 @@
+"""
+Profiles how long ``import mainapi`` takes in a fresh interpreter (what
+every worker pays on boot) and fails when it goes over budget or when a
+dependency that should load lazily is imported at startup.
+
+Reports the median over --runs of the whole import and of each module
+mainapi imports directly, from ``python -X importtime``.
+
+Usage:
+    python benchmarks/import_budget.py --budget-ms 1000
+Exits with status 1 when over budget or when a lazy module was imported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Only needed by specific routes or scripts; importing any of them from
+# mainapi's module level is a regression
+LAZY_MODULES = ("pandas", "openai", "authlib", "pyarrow", "gspread", "jinja2")
+
+PROBE = (
+    "import json, sys; import mainapi; "
+    f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+)
+
+
+def profile_once():
+    """
+    Imports mainapi in a fresh interpreter. Returns the total import time
+    (seconds), ``{module: cumulative seconds}`` for mainapi's direct imports
+    and the lazy modules that got loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    direct = {}
+    # -X importtime prints children before their parent, two spaces deeper
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        seconds = int(cumulative) / 1e6
+        depth = len(name) - len(name.lstrip())
+        if depth == 3:
+            children[name.strip()] = seconds
+        elif depth == 1:
+            if name.strip() == "mainapi":
+                total, direct = seconds, children
+            children = {}
+    return total, direct, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    totals = []
+    per_module = {}
+    loaded = set()
+    for _ in range(args.runs):
+        total, direct, lazy_loaded = profile_once()
+        totals.append(total)
+        for name, seconds in direct.items():
+            per_module.setdefault(name, []).append(seconds)
+        loaded.update(lazy_loaded)
+
+    median_ms = statistics.median(totals) * 1000
+    print(f"import mainapi: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {min(totals) * 1000:.0f}, max {max(totals) * 1000:.0f}), budget {args.budget_ms:.0f} ms")
+    ranked = sorted(per_module.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in ranked[:args.top]:
+        print(f"  {statistics.median(samples) * 1000:8.1f} ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL lazily loaded modules imported at startup: {', '.join(sorted(loaded))}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL import time {median_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
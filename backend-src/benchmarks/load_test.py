@@ -0,0 +1,294 @@
+"""
+End-to-end load test of the API: /join-org bursts, /protected/get-roster,
+/get-schema and /generate-mql against a synthetic org, reporting p50/p95/p99
+latency and throughput per scenario and comparing them with a stored baseline.
+
+The API runs under uvicorn in a subprocess against a local mongod, with
+Auth0 (JWKS, Management API) and OpenAI replaced by the local stand-ins, so
+nothing leaves the machine. Requests carry a bearer token signed by the
+stand-in key and a server-side session seeded for the bench user.
+
+Usage (against a local mongod):
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/load_test.py --members 100000
+    ... --save-baseline        # record the current numbers as the baseline
+Exits with status 1 when a scenario regresses past --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import secrets
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from pymongo import MongoClient
+
+import auth_standin
+import openai_standin
+from synthetic_org import BACKEND_DIR, BENCH_USER, member, seed_org
+
+from components.mongo import MONGO_DB_NAME
+from components.sessions import SESSION_COLLECTION
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+AUTH0_DOMAIN = "standin.local"
+AUDIENCE = "https://api.fastorg.test"
+SCENARIOS = ("join-org", "get-roster", "get-schema", "generate-mql")
+# Members added by the join-org burst, removed again afterwards
+JOIN_EMAIL_DOMAIN = "join.bench.example"
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run_scenario(make_request, requests, concurrency, warmup):
+    """
+    Sends ``requests`` requests built by ``make_request(n)`` with at most
+    ``concurrency`` in flight, after ``warmup`` untimed ones. Non-2xx
+    responses and transport errors count as errors.
+    """
+    for n in range(warmup):
+        await make_request(-1 - n)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(n):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await make_request(n)
+                ok = response.is_success
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(requests)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def seed_session(db, org_name, token):
+    """
+    Stores a logged-in server-side session for the bench user and returns its ID.
+    """
+    session_id = secrets.token_urlsafe(32)
+    payload = {
+        "user": {"sub": BENCH_USER, "user_metadata": {"org_name": org_name}},
+        "access_token": token,
+    }
+    db[SESSION_COLLECTION].replace_one(
+        {"_id": session_id},
+        {"data": json.dumps(payload), "expires_at": datetime.now(timezone.utc) + timedelta(hours=1)},
+        upsert=True,
+    )
+    return session_id
+
+
+def start_api(port, env):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "mainapi:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API process exited during startup")
+        try:
+            httpx.get(f"{url}/generate-mql/stats", timeout=1)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API did not start within 30s")
+
+
+def build_scenarios(client, org_name, invite_code, token, session_id, args):
+    auth = {"Authorization": f"Bearer {token}"}
+    cookies = {"sid": session_id}
+    # Prompts the rule-based fast path doesn't parse, so they reach the LLM
+    # (once each; repeats are served by the MQL cache)
+    prompts = [f"which members would enjoy the trip number {n}" for n in range(args.prompts)]
+    roster_params = {"limit": args.roster_limit} if args.roster_limit else {}
+    rng = random.Random(1)
+
+    return {
+        "join-org": lambda n: client.post(
+            "/join-org",
+            params={"invite_code": invite_code},
+            json={**member(n, rng), "email": f"join{n}@{JOIN_EMAIL_DOMAIN}"},
+        ),
+        "get-roster": lambda n: client.get(
+            "/protected/get-roster", params=roster_params, headers=auth, cookies=cookies
+        ),
+        "get-schema": lambda n: client.get("/get-schema", params={"invite_code": invite_code}),
+        "generate-mql": lambda n: client.post(
+            "/generate-mql", json={"prompt": prompts[n % len(prompts)], "org_name": org_name}
+        ),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the regressions of ``results`` against ``baseline``: p95 latency
+    above, or throughput below, the baseline by more than ``tolerance``.
+    """
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {before['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+        if current["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {current['errors']}")
+    return regressions
+
+
+async def run(args, db):
+    org_name, invite_code = seed_org(db, args.members, reseed=args.reseed)
+
+    key = auth_standin.SigningKey()
+    issuer = f"https://{AUTH0_DOMAIN}/"
+    token = key.sign({"sub": BENCH_USER, "aud": AUDIENCE, "iss": issuer}, ttl=24 * 3600)
+    session_id = seed_session(db, org_name, token)
+    auth_app = auth_standin.create_app([key], issuer)
+    llm_app = openai_standin.create_app(delay=args.llm_delay)
+
+    with auth_standin.serve(auth_app, args.auth_port) as auth_url, \
+            auth_standin.serve(llm_app, args.openai_port) as openai_url:
+        env = {
+            **os.environ,
+            "AUTH0_DOMAIN": AUTH0_DOMAIN,
+            "AUTH0_BASE_URL": auth_url,
+            "AUTH0_AUDIENCE": AUDIENCE,
+            "OPENAI_BASE_URL": f"{openai_url}/v1",
+            "OPENAI_API_KEY": "standin",
+            "APP_SECRET_KEY": "load-test",
+            "MONGO_URI": args.mongo_uri,
+            "SESSION_BACKEND": "mongo",
+        }
+        api, api_url = start_api(args.api_port, env)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=60) as client:
+                scenarios = build_scenarios(client, org_name, invite_code, token, session_id, args)
+                results = {}
+                for name in args.scenarios:
+                    results[name] = await run_scenario(
+                        scenarios[name], args.requests, args.concurrency, args.warmup
+                    )
+        finally:
+            api.terminate()
+            api.wait()
+            db[org_name].delete_many({"email": {"$regex": f"@{re.escape(JOIN_EMAIL_DOMAIN)}$"}})
+            db[SESSION_COLLECTION].delete_one({"_id": session_id})
+
+    if "generate-mql" in results:
+        results["generate-mql"]["llm_calls"] = llm_app.state.calls
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=1000, help="Synthetic org size (1k-1M)")
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--roster-limit", type=int, default=100,
+                        help="get-roster page size; 0 streams the whole roster")
+    parser.add_argument("--prompts", type=int, default=20, help="Distinct LLM-bound generate-mql prompts")
+    parser.add_argument("--llm-delay", type=float, default=0.3, help="Stand-in completion latency (s)")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--baseline", help="Baseline file (default: baselines/load_<members>_c<concurrency>.json)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--api-port", type=int, default=8800)
+    parser.add_argument("--auth-port", type=int, default=8765)
+    parser.add_argument("--openai-port", type=int, default=8766)
+    args = parser.parse_args()
+
+    args.scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    baseline_path = args.baseline or os.path.join(
+        HERE, "baselines", f"load_{args.members}_c{args.concurrency}.json"
+    )
+
+    args.mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+    client = MongoClient(args.mongo_uri)
+    try:
+        results = asyncio.run(run(args, client[MONGO_DB_NAME]))
+    finally:
+        client.close()
+
+    print(f"{'scenario':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(f"{name:<14}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['errors']:>8}")
+    if "generate-mql" in results:
+        print(f"generate-mql made {results['generate-mql']['llm_calls']} upstream LLM calls")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as file:
+            json.dump({
+                "members": args.members,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "recorded_at": datetime.now(timezone.utc).isoformat(),
+                "scenarios": results,
+            }, file, indent=2)
+        print(f"baseline saved to {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print(f"no baseline at {baseline_path}; rerun with --save-baseline to record one")
+        return
+
+    with open(baseline_path, encoding="utf-8") as file:
+        regressions = compare(results, json.load(file), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
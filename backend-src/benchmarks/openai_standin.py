@@ -0,0 +1,40 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint. Returns a canned
+completion after a configurable delay and counts upstream calls.
+"""
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+
+CANNED_MQL = '{ "gpa": { "$lt": 2.0 } }'
+
+
+def create_app(delay=0.5, content=CANNED_MQL):
+    """
+    Builds the stand-in app. ``app.state.calls`` counts completions served.
+    Point clients at it with ``OPENAI_BASE_URL=<url>/v1``.
+    """
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.delay = delay
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        await asyncio.sleep(app.state.delay)
+        return {
+            "id": f"chatcmpl-standin-{app.state.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
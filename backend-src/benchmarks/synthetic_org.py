@@ -0,0 +1,121 @@
+"""
+Synthetic org generator for load tests: an org document with an invite
+code, the default schema, a ``users`` membership for the bench user and
+1k to 1M members shaped like schema.json. Members are generated lazily
+and written in batches, so even 1M members never sit in memory at once.
+
+Usage (against a local mongod):
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/synthetic_org.py --members 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import islice
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from pymongo import MongoClient
+
+from components.mongo import MONGO_DB_NAME, get_mongo_uri
+from components.org_schema import load_default_schema
+
+BENCH_USER = "auth0|loadtest"
+CLASSES = ["Freshman", "Sophomore", "Junior", "Senior"]
+MAJORS = ["Computer Science", "Mathematics", "Biology", "Economics", "Physics", "History", "Chemistry"]
+SHIRTS = ["S", "M", "L", "XL"]
+
+
+def org_name_for(count):
+    return f"bench_{count}"
+
+
+def invite_code_for(count):
+    # Matches INVITE_CODE_PATTERN, so the invite cache looks it up
+    return f"bench-invite-{count}"
+
+
+def member(n, rng):
+    """
+    Returns one member document matching the default schema.
+    """
+    return {
+        "name": f"Member {n}",
+        "class": rng.choice(CLASSES),
+        "address": f"{rng.randint(1, 9999)} State St",
+        "gpa": round(rng.uniform(1.5, 4.0), 2),
+        "major": rng.choice(MAJORS),
+        "grad": f"May {rng.randint(2026, 2029)}",
+        "phone": f"765-{rng.randint(0, 9999999):07d}",
+        "email": f"member{n}@bench.example",
+        "shirt": rng.choice(SHIRTS),
+    }
+
+
+def generate_members(count, seed=0):
+    """
+    Yields ``count`` members; the same ``seed`` always yields the same org.
+    """
+    rng = random.Random(seed)
+    for n in range(count):
+        yield member(n, rng)
+
+
+def seed_org(db, count, batch_size=10000, seed=0, reseed=False):
+    """
+    Creates (or reuses) the synthetic org with ``count`` members and returns
+    ``(org_name, invite_code)``. An existing org of the right size is left
+    as is unless ``reseed`` is set.
+    """
+    org_name = org_name_for(count)
+    invite_code = invite_code_for(count)
+    members = db[org_name]
+
+    if not reseed and members.estimated_document_count() == count:
+        return org_name, invite_code
+
+    members.drop()
+    schema = load_default_schema(os.path.join(BACKEND_DIR, "schema.json"))
+    db["schemas"].replace_one(
+        {"org_name": org_name}, {"org_name": org_name, "fields": list(schema.fields)}, upsert=True
+    )
+    db["organizations"].replace_one(
+        {"org_name": org_name}, {"org_name": org_name, "invite_code": invite_code}, upsert=True
+    )
+    db["users"].update_one(
+        {"user_id": BENCH_USER}, {"$set": {"org_name": org_name, "role": "admin"}}, upsert=True
+    )
+
+    generated = generate_members(count, seed)
+    while True:
+        batch = list(islice(generated, batch_size))
+        if not batch:
+            break
+        members.insert_many(batch, ordered=False)
+    return org_name, invite_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reseed", action="store_true", help="Drop and regenerate an existing org")
+    args = parser.parse_args()
+
+    client = MongoClient(get_mongo_uri())
+    try:
+        start = time.perf_counter()
+        org_name, invite_code = seed_org(
+            client[MONGO_DB_NAME], args.members, args.batch_size, args.seed, args.reseed
+        )
+        print(f"{org_name}: {args.members} members, invite code {invite_code} "
+              f"({time.perf_counter() - start:.1f}s)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
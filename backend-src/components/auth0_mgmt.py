@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+
+from components.metrics import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+
+class Auth0ManagementClient:
+    """
+    Shared client for the Auth0 Management API.
+
+    The client-credentials token is cached until ``refresh_margin`` seconds
+    before it expires. Inside that margin callers keep using the current token
+    while one background task fetches the next one; only an expired (or
+    missing) token makes a caller wait, and concurrent waiters share a single
+    token request.
+    """
+
+    def __init__(self, domain, client_id, client_secret, base_url=None, refresh_margin=300, timeout=10.0):
+        self.audience = f"https://{domain}/api/v2/"
+        self.base_url = (base_url or f"https://{domain}").rstrip("/")
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_task = None
+        self._lock = None
+        self._http = None
+
+    @classmethod
+    def from_env(cls):
+        domain = os.getenv("AUTH0_DOMAIN")
+        return cls(
+            domain=domain,
+            client_id=os.getenv("AUTH0_MGMT_CLIENT_ID") or os.getenv("AUTH0_CLIENT_ID"),
+            client_secret=os.getenv("AUTH0_MGMT_CLIENT_SECRET") or os.getenv("AUTH0_CLIENT_SECRET"),
+            base_url=os.getenv("AUTH0_BASE_URL"),
+        )
+
+    def _get_http(self):
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, transport=InstrumentedTransport("auth0")
+            )
+        return self._http
+
+    def _get_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _fetch_token(self):
+        response = await self._get_http().post(
+            "/oauth/token",
+            json={
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "audience": self.audience,
+                "grant_type": "client_credentials",
+            },
+        )
+        if not response.is_success:
+            raise httpx.HTTPStatusError(
+                f"Failed to get Auth0 access token: {response.text}",
+                request=response.request,
+                response=response,
+            )
+
+        token_data = response.json()
+        self._token = token_data["access_token"]
+        self._expires_at = time.time() + token_data.get("expires_in", 86400)
+        logger.info("Fetched Auth0 Management API token")
+
+    async def _refresh(self, margin):
+        async with self._get_lock():
+            # Someone else refreshed while we waited
+            if self._token and time.time() < self._expires_at - margin:
+                return
+            await self._fetch_token()
+
+    async def _background_refresh(self):
+        try:
+            await self._refresh(self.refresh_margin)
+        except Exception as e:
+            logger.warning(f"Background Auth0 token refresh failed: {e}")
+
+    async def get_token(self):
+        """
+        Returns a valid Management API access token.
+        """
+        now = time.time()
+        if self._token and now < self._expires_at - self.refresh_margin:
+            return self._token
+
+        if self._token and now < self._expires_at:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._background_refresh())
+            return self._token
+
+        await self._refresh(0)
+        return self._token
+
+    def invalidate_token(self):
+        self._token = None
+        self._expires_at = 0.0
+
+    async def request(self, method, path, **kwargs):
+        """
+        Sends an authenticated request to ``/api/v2{path}``. A 401 (token
+        revoked or rotated early) invalidates the cached token and is retried once.
+        """
+        extra_headers = kwargs.pop("headers", {})
+        for attempt in range(2):
+            token = await self.get_token()
+            headers = {**extra_headers, "Authorization": f"Bearer {token}"}
+            response = await self._get_http().request(method, f"/api/v2{path}", headers=headers, **kwargs)
+            if response.status_code != 401 or attempt:
+                return response
+            self.invalidate_token()
+
+    async def get_user(self, user_id):
+        return await self.request("GET", f"/users/{user_id}")
+
+    async def update_user(self, user_id, data):
+        return await self.request("PATCH", f"/users/{user_id}", json=data)
+
+    async def create_organization(self, name, display_name):
+        return await self.request("POST", "/organizations", json={"name": name, "display_name": display_name})
+
+    async def get_organization_by_name(self, name):
+        return await self.request("GET", f"/organizations/name/{name}")
+
+    async def add_organization_members(self, org_id, user_ids):
+        return await self.request("POST", f"/organizations/{org_id}/members", json={"members": user_ids})
+
+    async def aclose(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+_client = None
+
+
+def get_auth0_client():
+    """
+    Returns the process-wide Management API client, created on first use.
+    """
+    global _client
+    if _client is None:
+        _client = Auth0ManagementClient.from_env()
+    return _client
+
+
+async def close_auth0_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,124 @@
+import time
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+MAX_REPORTED_ERRORS = 100
+DUPLICATE_KEY_ERROR = 11000
+
+
+@dataclass
+class IngestStats:
+    """
+    Running totals for a bulk member import.
+    """
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    existing: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    max_errors: int = MAX_REPORTED_ERRORS
+
+    def reject(self, row_number, message):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((row_number, message))
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.started_at
+        return self.rows_read / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (
+            f"{self.rows_read} rows read, {self.inserted} inserted, {self.updated} updated, "
+            f"{self.existing} already present, "
+            f"{self.duplicates} duplicate in file, {self.rejected} rejected "
+            f"({self.rows_per_second:.0f} rows/s)"
+        )
+
+
+def overwrite_update(doc, updated_at):
+    """
+    Update pipeline that replaces ``doc``'s fields on the stored member and
+    moves ``updated_at`` only if one of them actually changed, so re-applying
+    an unchanged row is a no-op (and doesn't wake incremental alerts).
+    """
+    unchanged = {"$and": [{"$eq": [f"${name}", {"$literal": value}]} for name, value in doc.items()]}
+    return [
+        {"$set": {"updated_at": {"$cond": [unchanged, {"$ifNull": ["$updated_at", updated_at]}, updated_at]}}},
+        {"$set": {name: {"$literal": value} for name, value in doc.items()}},
+    ]
+
+
+def build_upserts(docs, key, stats, overwrite=False):
+    """
+    Turns a chunk of ``(row_number, doc)`` pairs into unordered upserts keyed
+    on ``key``. Rows repeating a key already seen in the chunk are dropped,
+    and ``$setOnInsert`` leaves documents already in the database untouched,
+    so the database dedupes without a read per row. With ``overwrite`` the
+    row's fields replace the stored ones instead (see overwrite_update).
+    """
+    seen = set()
+    ops = []
+    row_numbers = []
+    updated_at = datetime.now(timezone.utc)
+    for row_number, doc in docs:
+        value = doc.get(key)
+        if value in (None, ""):
+            stats.reject(row_number, f"Missing {key}")
+            continue
+        if value in seen:
+            stats.duplicates += 1
+            continue
+        seen.add(value)
+        update = overwrite_update(doc, updated_at) if overwrite else {"$setOnInsert": {**doc, "updated_at": updated_at}}
+        ops.append(UpdateOne({key: value}, update, upsert=True))
+        row_numbers.append(row_number)
+    return ops, row_numbers
+
+
+def _record_result(result, row_numbers, stats):
+    stats.inserted += result.get("nUpserted", 0)
+    stats.updated += result.get("nModified", 0)
+    stats.existing += result.get("nMatched", 0) - result.get("nModified", 0)
+    for error in result.get("writeErrors", []):
+        if error.get("code") == DUPLICATE_KEY_ERROR:
+            # Lost an upsert race with a concurrent writer on the unique index
+            stats.existing += 1
+        else:
+            stats.reject(row_numbers[error["index"]], error.get("errmsg", "write error"))
+
+
+def write_chunk(collection, docs, key, stats, overwrite=False):
+    """
+    Writes one chunk with a single unordered bulk_write (sync driver).
+    """
+    ops, row_numbers = build_upserts(docs, key, stats, overwrite)
+    if not ops:
+        return
+    try:
+        result = collection.bulk_write(ops, ordered=False).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+    _record_result(result, row_numbers, stats)
+
+
+async def write_chunk_async(collection, docs, key, stats):
+    """
+    Writes one chunk with a single unordered bulk_write (async driver).
+    """
+    ops, row_numbers = build_upserts(docs, key, stats)
+    if not ops:
+        return
+    try:
+        result = (await collection.bulk_write(ops, ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+    _record_result(result, row_numbers, stats)
@@ -0,0 +1,155 @@
+import argparse
+import logging
+import sys
+from datetime import datetime
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Indexes for the shared collections, keyed by collection name
+COLLECTION_INDEXES = {
+    "organizations": [
+        IndexModel([("invite_code", ASCENDING)], name="invite_code_unique", unique=True),
+        IndexModel([("org_name", ASCENDING)], name="org_name_unique", unique=True),
+    ],
+    "schemas": [
+        IndexModel([("org_name", ASCENDING)], name="org_name_unique", unique=True),
+    ],
+    "users": [
+        # Upsert key for memberships (join_org, create_org)
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    # Server-side sessions (components/sessions.py) expire through this TTL index
+    "sessions": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "alerts": [
+        IndexModel([("organization_name", ASCENDING), ("alert_type", ASCENDING)], name="org_alert_type"),
+        # Required by the $merge in alerts.py
+        IndexModel(
+            [("organization_name", ASCENDING), ("member_id", ASCENDING), ("alert_type", ASCENDING)],
+            name="org_member_alert_unique",
+            unique=True,
+        ),
+    ],
+}
+
+# Indexes superseded by a differently specified one in the registry; dropped
+# (if present) before it is applied so the replacement can be built
+RETIRED_INDEXES = {
+    "users": ["user_id"],
+}
+
+# Indexes every per-org member collection gets. The placeholder document
+# create_org_mongo inserts has no email, hence the partial filter.
+ORG_INDEXES = [
+    IndexModel(
+        [("email", ASCENDING)],
+        name="email_unique",
+        unique=True,
+        partialFilterExpression={"email": {"$type": "string"}},
+    ),
+    # Change watermark for incremental alert evaluation
+    IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+]
+
+# Representative filters for every hot lookup path; each must be index-backed.
+# None stands for "every org collection".
+HOT_QUERIES = [
+    ("organizations", {"invite_code": "hot-query-check"}),
+    ("organizations", {"org_name": "hot-query-check"}),
+    ("schemas", {"org_name": "hot-query-check"}),
+    ("users", {"user_id": "hot-query-check"}),
+    ("alerts", {"organization_name": "hot-query-check", "alert_type": "low_gpa"}),
+    (None, {"email": "hot-query-check"}),
+    (None, {"updated_at": {"$gt": datetime(2000, 1, 1)}}),
+]
+
+
+def org_collection_name(org_name):
+    return org_name.replace(" ", "_").lower()
+
+
+async def ensure_org_indexes(db, collection_name):
+    """
+    Creates the per-org member indexes on one org collection (async driver).
+    """
+    await db[collection_name].create_indexes(ORG_INDEXES)
+
+
+async def ensure_indexes(db):
+    """
+    Applies the whole registry: shared collections plus every existing org
+    collection. Index builds that fail (e.g. existing duplicates blocking a
+    unique index) are logged instead of aborting startup.
+    """
+    for collection_name, names in RETIRED_INDEXES.items():
+        for name in names:
+            try:
+                await db[collection_name].drop_index(name)
+            except OperationFailure:
+                pass  # Already gone
+
+    for collection_name, indexes in COLLECTION_INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error(f"Could not create indexes on {collection_name}: {e}")
+
+    async for org_doc in db["organizations"].find({}, {"org_name": 1}):
+        collection_name = org_collection_name(org_doc["org_name"])
+        try:
+            await ensure_org_indexes(db, collection_name)
+        except OperationFailure as e:
+            logger.error(f"Could not create indexes on {collection_name}: {e}")
+
+
+def plan_stages(plan):
+    yield plan.get("stage")
+    for child in plan.get("inputStages", []) + [plan[key] for key in ("inputStage", "queryPlan") if key in plan]:
+        yield from plan_stages(child)
+
+
+def check_query_plans(db, org_collections):
+    """
+    Runs explain() on every registered hot query (sync driver) and returns
+    a list of ``(collection, filter, stages)`` for plans that scan the collection.
+    """
+    failures = []
+    for collection_name, query in HOT_QUERIES:
+        targets = org_collections if collection_name is None else [collection_name]
+        for target in targets:
+            explain = db.command("explain", {"find": target, "filter": query}, verbosity="queryPlanner")
+            stages = list(plan_stages(explain["queryPlanner"]["winningPlan"]))
+            if "COLLSCAN" in stages:
+                failures.append((target, query, stages))
+    return failures
+
+
+def main():
+    from dotenv import find_dotenv, load_dotenv
+    from components.mongo import get_sync_db
+
+    ENV_FILE = find_dotenv()
+    if ENV_FILE:
+        load_dotenv(ENV_FILE)
+
+    parser = argparse.ArgumentParser(description="Verify that every hot query is index-backed")
+    parser.add_argument("--org", action="append", default=[], help="org collection to check (default: all)")
+    args = parser.parse_args()
+
+    db = get_sync_db()
+    orgs = args.org or [org_collection_name(doc["org_name"]) for doc in db["organizations"].find({}, {"org_name": 1})]
+
+    failures = check_query_plans(db, orgs)
+    for collection_name, query, stages in failures:
+        print(f"COLLSCAN on {collection_name} for {query}: {' -> '.join(filter(None, stages))}")
+    if failures:
+        sys.exit(1)
+    print(f"All {len(HOT_QUERIES)} hot queries are index-backed")
+
+
+if __name__ == "__main__":
+    main()
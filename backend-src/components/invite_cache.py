@@ -0,0 +1,70 @@
+import re
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from components.org_schema import OrgSchemaCache, org_schemas
+from components.ttl_cache import TTLCache
+
+# Invite codes are secrets.token_urlsafe(8); anything else can't be one of ours
+INVITE_CODE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,32}$")
+
+
+class InviteCodeCache:
+    """
+    Resolves invite codes to their org and compiled schema.
+
+    Known codes are cached for ``ttl`` seconds. Unknown codes are remembered
+    for ``negative_ttl`` seconds, and malformed codes are rejected outright,
+    so repeated or brute-forced invalid codes do not reach MongoDB. A code
+    created by another worker can be shadowed by a negative entry here for at
+    most ``negative_ttl`` seconds; codes are random, so in practice this only
+    happens if someone probed that exact code beforehand.
+    """
+
+    def __init__(self, schema_cache: OrgSchemaCache, ttl=300, negative_ttl=60, maxsize=10000):
+        self.schema_cache = schema_cache
+        self._orgs = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._unknown = TTLCache(maxsize=maxsize, ttl=negative_ttl)
+
+    async def resolve_org(self, db: AsyncDatabase, invite_code):
+        """
+        Returns the org name for ``invite_code``, or None if the code is invalid.
+        """
+        if not invite_code or not INVITE_CODE_PATTERN.match(invite_code):
+            return None
+        if invite_code in self._unknown:
+            return None
+
+        org_name = self._orgs.get(invite_code)
+        if org_name is None:
+            org_doc = await db["organizations"].find_one({"invite_code": invite_code}, {"org_name": 1})
+            if not org_doc:
+                self._unknown.set(invite_code, True)
+                return None
+            org_name = org_doc["org_name"]
+            self._orgs.set(invite_code, org_name)
+        return org_name
+
+    async def resolve(self, db: AsyncDatabase, invite_code):
+        """
+        Returns ``(org_name, OrgSchema or None)``, or None if the code is invalid.
+        """
+        org_name = await self.resolve_org(db, invite_code)
+        if org_name is None:
+            return None
+        return org_name, await self.schema_cache.get(db, org_name)
+
+    def invalidate_code(self, invite_code):
+        self._orgs.pop(invite_code)
+        self._unknown.pop(invite_code)
+
+    def invalidate_org(self, org_name):
+        """
+        Drops the org's schema and every cached code that points at it.
+        """
+        self.schema_cache.invalidate(org_name)
+        for invite_code in self._orgs.keys_for(org_name):
+            self._orgs.pop(invite_code)
+
+
+invite_codes = InviteCodeCache(org_schemas)
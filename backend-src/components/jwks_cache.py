@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+
+import httpx
+from jose import jwk
+
+from components.metrics import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    """
+    In-process cache of an Auth0 tenant's signing keys and OIDC metadata.
+
+    Keys are parsed into RSA public keys once per fetch and looked up by
+    ``kid``. The whole key set is refreshed after ``ttl`` seconds; an unknown
+    ``kid`` (key rotation) triggers an early refresh, which is single-flight and
+    rate-limited to one attempt per ``min_refresh_interval`` seconds so a flood
+    of tokens with a bogus ``kid`` cannot hammer the tenant.
+    """
+
+    def __init__(self, base_url, ttl=3600, min_refresh_interval=30, timeout=5.0):
+        self.base_url = base_url.rstrip("/")
+        self.jwks_url = f"{self.base_url}/.well-known/jwks.json"
+        self.metadata_url = f"{self.base_url}/.well-known/openid-configuration"
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+
+        self._keys = {}
+        self._metadata = None
+        self._fetched_at = 0.0
+        self._metadata_fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._lock = None
+
+    def _get_lock(self):
+        # Created lazily so the lock binds to the server's event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _is_stale(self, fetched_at):
+        return time.monotonic() - fetched_at >= self.ttl
+
+    async def _get_json(self, url):
+        async with httpx.AsyncClient(timeout=self.timeout, transport=InstrumentedTransport("jwks")) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+            return response.json()
+
+    async def refresh(self, force=False):
+        """
+        Re-downloads the key set. Concurrent callers share one download.
+
+        :param force: Refresh even though the cached keys are still fresh
+            (used on an unknown ``kid``); subject to ``min_refresh_interval``.
+        """
+        requested_at = time.monotonic()
+        async with self._get_lock():
+            # Another coroutine refreshed while we were waiting on the lock
+            if self._fetched_at >= requested_at:
+                return
+            if not force and self._keys and not self._is_stale(self._fetched_at):
+                return
+            if self._keys and time.monotonic() - self._last_attempt < self.min_refresh_interval:
+                return
+
+            self._last_attempt = time.monotonic()
+            jwks = await self._get_json(self.jwks_url)
+
+            keys = {}
+            for key in jwks.get("keys", []):
+                if key.get("kty") != "RSA" or key.get("use", "sig") != "sig":
+                    continue
+                try:
+                    keys[key["kid"]] = jwk.construct(key, "RS256")
+                except Exception as e:
+                    logger.warning(f"Skipping unusable JWKS key {key.get('kid')}: {e}")
+
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            logger.info(f"Loaded {len(keys)} signing keys from {self.jwks_url}")
+
+    async def get_signing_key(self, kid):
+        """
+        Returns the parsed public key for ``kid``, or None if the tenant does
+        not publish it even after a refresh.
+        """
+        if not self._keys or self._is_stale(self._fetched_at):
+            try:
+                await self.refresh()
+            except httpx.HTTPError as e:
+                # Keep serving the previous key set if the tenant is briefly unreachable
+                if not self._keys:
+                    raise
+                logger.warning(f"JWKS refresh failed, using cached keys: {e}")
+
+        key = self._keys.get(kid)
+        if key is None:
+            await self.refresh(force=True)
+            key = self._keys.get(kid)
+        return key
+
+    async def get_oidc_metadata(self):
+        """
+        Returns the tenant's OpenID configuration, cached for ``ttl`` seconds.
+        """
+        if self._metadata is None or self._is_stale(self._metadata_fetched_at):
+            async with self._get_lock():
+                if self._metadata is None or self._is_stale(self._metadata_fetched_at):
+                    self._metadata = await self._get_json(self.metadata_url)
+                    self._metadata_fetched_at = time.monotonic()
+        return self._metadata
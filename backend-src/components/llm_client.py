@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+
+from components.metrics import UPSTREAM_ERRORS, upstream_event_hooks
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClient:
+    """
+    Shared async OpenAI chat client.
+
+    One AsyncOpenAI instance (and its HTTP connection pool) serves every
+    request. A semaphore caps in-flight completions, and concurrent calls
+    with the same ``coalesce_key`` share a single upstream request.
+    """
+
+    def __init__(self, model="gpt-4o-mini", max_concurrency=8, timeout=30.0, api_key=None, base_url=None):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.api_key = api_key
+        self.base_url = base_url
+        self.upstream_calls = 0
+
+        self._client = None
+        self._semaphore = None
+        self._inflight = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=os.getenv("OPENAI_BASE_URL"),
+        )
+
+    def _get_client(self):
+        if self._client is None:
+            # Imported on first use; openai is only needed by /generate-mql
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http_client=DefaultAsyncHttpxClient(event_hooks=upstream_event_hooks("openai")),
+            )
+        return self._client
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _complete(self, messages, temperature, max_tokens):
+        from openai import APIConnectionError
+
+        async with self._get_semaphore():
+            self.upstream_calls += 1
+            try:
+                response = await self._get_client().chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+            except APIConnectionError as e:
+                UPSTREAM_ERRORS.labels("openai", type(e).__name__).inc()
+                raise
+        return response.choices[0].message.content
+
+    async def complete(self, messages, temperature=0.0, max_tokens=500, coalesce_key=None):
+        """
+        Returns the completion text for ``messages``.
+
+        :param coalesce_key: Hashable key identifying equivalent requests;
+            callers that arrive while one is in flight await its result.
+        """
+        if coalesce_key is None:
+            return await self._complete(messages, temperature, max_tokens)
+
+        task = self._inflight.get(coalesce_key)
+        if task is None:
+            task = asyncio.ensure_future(self._complete(messages, temperature, max_tokens))
+            self._inflight[coalesce_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(coalesce_key, None))
+        # Shield so one caller disconnecting doesn't cancel the others' result
+        return await asyncio.shield(task)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_client = None
+
+
+def get_llm_client():
+    """
+    Returns the process-wide LLM client, created on first use.
+    """
+    global _client
+    if _client is None:
+        _client = LLMClient.from_env()
+    return _client
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
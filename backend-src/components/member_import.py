@@ -0,0 +1,222 @@
+import asyncio
+import codecs
+import csv
+import json
+from collections import deque
+
+from components.bulk_writer import write_chunk_async
+
+# Longest line, or CSV record waiting for a closing quote, the bulk import buffers
+MAX_CSV_RECORD_CHARS = 65536
+
+
+def load_schema_fields(schema_path="schema.json"):
+    """
+    Loads the member field definitions ({"name", "label", "type", "required"})
+    from a schema file such as schema.json.
+    """
+    with open(schema_path, 'r', encoding='utf-8') as f:
+        return json.load(f)["fields"]
+
+
+def build_column_map(headers, fields):
+    """
+    Maps each column header that matches a schema field, by label (the Google
+    Form question) or by field name, ignoring case, to that field's name.
+    """
+    lookup = {}
+    for field in fields:
+        lookup[field["name"].strip().lower()] = field["name"]
+        lookup[field.get("label", field["name"]).strip().lower()] = field["name"]
+    return {header: lookup[header.strip().lower()] for header in headers if header.strip().lower() in lookup}
+
+
+def map_rows(rows, column_map, validator, stats, first_row_number=2):
+    """
+    Yields (row_number, document) for every row that passes the org's
+    compiled MemberValidator, rejecting the rest into ``stats``. Row 1 is
+    the header in CSVs and sheets.
+    """
+    for row_number, row in enumerate(rows, start=first_row_number):
+        stats.rows_read += 1
+        doc, errors = validator.check({field_name: row.get(column) for column, field_name in column_map.items()})
+        if errors:
+            stats.reject(row_number, "; ".join(error["message"] for error in errors))
+            continue
+        yield row_number, doc
+
+
+async def iter_lines(chunks, max_line_chars=MAX_CSV_RECORD_CHARS):
+    """
+    Re-splits an async stream of byte chunks (e.g. ``request.stream()``) into
+    decoded lines, without holding more than one partial line in memory.
+    A line longer than ``max_line_chars`` is dropped as it arrives and
+    yielded as None, so callers can reject it as a row.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    # Pieces of the current line; only the newly decoded text is split
+    partial = []
+    partial_chars = 0
+    async for chunk in chunks:
+        *ends, rest = decoder.decode(chunk).split("\n")
+        for end in ends:
+            partial_chars += len(end)
+            yield None if partial_chars > max_line_chars else ("".join(partial) + end).rstrip("\r")
+            partial, partial_chars = [], 0
+        partial_chars += len(rest)
+        # Past the cap, keep counting but stop buffering until the line ends
+        partial = partial + [rest] if partial_chars <= max_line_chars else []
+    rest = decoder.decode(b"", final=True)
+    partial_chars += len(rest)
+    if partial_chars > max_line_chars:
+        yield None
+    elif partial_chars:
+        yield ("".join(partial) + rest).rstrip("\r")
+
+
+async def iter_ndjson_rows(lines):
+    """
+    Yields ``(row_number, record, error)`` for each non-blank NDJSON line;
+    ``record`` is None and ``error`` set when the line is not a JSON object
+    or was too long for iter_lines.
+    """
+    row_number = 0
+    async for line in lines:
+        row_number += 1
+        if line is None:
+            yield row_number, None, f"Line is longer than {MAX_CSV_RECORD_CHARS} characters"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, record, None
+
+
+# Marks the end of the line stream inside iter_csv_rows
+_END_OF_BODY = object()
+
+
+def _ends_in_quotes(line, in_quotes):
+    """
+    Returns whether a CSV record is still inside a quoted field at the end of
+    ``line``, following the csv module's rules: a quote opens a quoted field
+    only at the start of a field, and ``""`` inside one is an escaped quote.
+    """
+    field_start = not in_quotes
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if in_quotes:
+            if char == '"':
+                if line.startswith('"', i + 1):
+                    i += 1
+                else:
+                    in_quotes = False
+        elif char == '"' and field_start:
+            in_quotes = True
+        field_start = char == "," and not in_quotes
+        i += 1
+    return in_quotes
+
+
+async def iter_csv_rows(lines, fields, max_record_chars=MAX_CSV_RECORD_CHARS):
+    """
+    Yields ``(row_number, record, error)`` for each CSV data row, with columns
+    renamed to schema field names via build_column_map. Quoted fields may
+    span lines. A record still open after ``max_record_chars`` or at the end
+    of the body (an opening quote that is never closed) is rejected as one
+    row for its first line, and the lines buffered after that one are parsed
+    again as records of their own, so the valid rows among them still load.
+    """
+    column_map = None
+    record_lines = []
+    record_chars = 0
+    in_quotes = False
+    row_number = 0
+    replay = deque()
+    source = lines.__aiter__()
+
+    while True:
+        if replay:
+            line = replay.popleft()
+        else:
+            try:
+                line = await source.__anext__()
+            except StopAsyncIteration:
+                line = _END_OF_BODY
+
+        if line is _END_OF_BODY:
+            if not record_lines:
+                break
+            error = "Unterminated quoted field"
+        elif line is None:
+            # iter_lines dropped a line over its length cap
+            if not record_lines:
+                row_number += 1
+                yield row_number, None, f"Line is longer than {max_record_chars} characters"
+                continue
+            error = f"Record is longer than {max_record_chars} characters or has an unclosed quote"
+        else:
+            # Most lines have no quotes and are a whole record on their own
+            if in_quotes or '"' in line:
+                in_quotes = _ends_in_quotes(line, in_quotes)
+            record_lines.append(line)
+            record_chars += len(line) + 1
+            if in_quotes:
+                if record_chars <= max_record_chars:
+                    continue
+                error = f"Record is longer than {max_record_chars} characters or has an unclosed quote"
+            else:
+                values = next(csv.reader(["\n".join(record_lines)]), [])
+                record_lines, record_chars = [], 0
+                row_number += 1
+                if column_map is None:
+                    column_map = build_column_map(values, fields)
+                    indexes = [(index, column_map[header]) for index, header in enumerate(values) if header in column_map]
+                    continue
+                if not any(values):
+                    continue
+                yield row_number, {name: values[index] for index, name in indexes if index < len(values)}, None
+                continue
+
+        # Reject the open record's first line and parse the lines after it again
+        row_number += 1
+        yield row_number, None, error
+        replay.extendleft(reversed(record_lines[1:] + ([None] if line is None else [])))
+        record_lines, record_chars, in_quotes = [], 0, False
+
+
+async def ingest_rows(rows, collection, validator, stats, batch_size=1000, key="email"):
+    """
+    Validates ``(row_number, record, error)`` rows as they arrive and writes
+    the valid ones with unordered bulk upserts (async driver), keeping one
+    batch in flight while the next is parsed. Bad rows go to ``stats``.
+    """
+    batch = []
+    pending = None
+    async for row_number, record, error in rows:
+        stats.rows_read += 1
+        if error is None:
+            member, errors = validator.check(record)
+            error = "; ".join(e["message"] for e in errors)
+        if error:
+            stats.reject(row_number, error)
+            continue
+        batch.append((row_number, member))
+        if len(batch) >= batch_size:
+            if pending:
+                await pending
+            pending = asyncio.create_task(write_chunk_async(collection, batch, key, stats))
+            batch = []
+
+    if pending:
+        await pending
+    if batch:
+        await write_chunk_async(collection, batch, key, stats)
@@ -0,0 +1,131 @@
+import math
+import os
+import re
+
+from components.org_schema import schema_version
+from components.ttl_cache import TTLCache
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+MAX_TEXT_LENGTH = int(os.getenv("MEMBER_MAX_TEXT_LENGTH", "1000"))
+
+
+class MemberValidationError(ValueError):
+    """
+    Raised by MemberValidator.validate; ``errors`` is a list of
+    ``{"field": ..., "message": ...}`` dicts, one per invalid field.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(error["message"] for error in errors))
+
+
+def _coerce_text(value):
+    if isinstance(value, str):
+        value = value.strip()
+    elif isinstance(value, (dict, list, tuple, set)):
+        raise ValueError("must be text")
+    else:
+        value = str(value)
+    if len(value) > MAX_TEXT_LENGTH:
+        raise ValueError(f"must be at most {MAX_TEXT_LENGTH} characters")
+    return value
+
+
+def _coerce_number(value):
+    if isinstance(value, bool):
+        raise ValueError("must be a number")
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        try:
+            number = float(str(value).strip().replace(",", ""))
+        except ValueError:
+            raise ValueError("must be a number")
+    if not math.isfinite(number):
+        raise ValueError("must be a number")
+    return number
+
+
+def _coerce_email(value):
+    value = _coerce_text(value)
+    if not EMAIL_PATTERN.match(value):
+        raise ValueError("must be an email address")
+    return value
+
+
+# Schema field type -> coercer; unknown types are treated as text
+COERCERS = {
+    "text": _coerce_text,
+    "number": _coerce_number,
+    "email": _coerce_email,
+}
+
+
+class MemberValidator:
+    """
+    Validator/coercer compiled once from an org's schema fields.
+
+    Compilation resolves every field to a ``(name, coercer, required)``
+    plan, so validating a member is a single pass over the schema with no
+    per-request schema lookups. Keys the schema doesn't define are dropped,
+    and empty values count as missing.
+    """
+
+    def __init__(self, fields):
+        self.plan = tuple(
+            (field["name"], COERCERS.get(field.get("type"), _coerce_text), bool(field.get("required")))
+            for field in fields
+        )
+
+    def check(self, data):
+        """
+        Returns ``(document, errors)``; ``errors`` is empty when ``data`` is valid.
+        """
+        document = {}
+        errors = []
+        for name, coerce, required in self.plan:
+            value = data.get(name)
+            if value is None or value == "":
+                if required:
+                    errors.append({"field": name, "message": f"Missing required field: {name}"})
+                continue
+            try:
+                value = coerce(value)
+            except ValueError as e:
+                errors.append({"field": name, "message": f"{name} {e}"})
+                continue
+            if value == "":
+                if required:
+                    errors.append({"field": name, "message": f"Missing required field: {name}"})
+                continue
+            document[name] = value
+        return document, errors
+
+    def validate(self, data):
+        """
+        Returns the coerced member document.
+
+        :raises MemberValidationError: If any field is missing or invalid.
+        """
+        document, errors = self.check(data)
+        if errors:
+            raise MemberValidationError(errors)
+        return document
+
+
+_validators = TTLCache(maxsize=1024, ttl=3600)
+
+
+def get_validator(fields, version=None):
+    """
+    Returns the compiled validator for ``fields``, shared by every caller with
+    the same schema version (pass ``OrgSchema.version`` when you have it).
+    """
+    version = version or schema_version(list(fields))
+    validator = _validators.get(version)
+    if validator is None:
+        validator = MemberValidator(fields)
+        _validators.set(version, validator)
+    return validator
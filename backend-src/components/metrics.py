@@ -0,0 +1,166 @@
+import time
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "fastorg_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "fastorg_http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ["method"],
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "fastorg_mongo_command_duration_seconds",
+    "MongoDB command latency reported by the driver",
+    ["command", "collection", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "fastorg_upstream_request_duration_seconds",
+    "Outbound HTTP latency to the response headers, by upstream service",
+    ["upstream", "method", "status"],
+)
+UPSTREAM_ERRORS = Counter(
+    "fastorg_upstream_errors_total",
+    "Outbound HTTP requests that failed without a response",
+    ["upstream", "error"],
+)
+
+# Collections reported by name; every per-org member collection shares one
+# label so the series count doesn't grow with the number of orgs
+NAMED_COLLECTIONS = {
+    "alerts", "alert_state", "organizations", "schemas", "sessions", "sheet_sync_state", "users",
+}
+
+
+def route_template(scope):
+    """
+    Returns the matched route's path template ("/protected/get-roster"),
+    rebuilt from the request path and its path parameters, or "unmatched".
+    """
+    if scope.get("endpoint") is None:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        path = path.replace(f"/{value}", f"/{{{name}}}", 1)
+    return path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request. It only reads the clock
+    and updates in-process counters; serialization happens when /metrics
+    is scraped.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_SECONDS.labels(method, route_template(scope), status).observe(time.perf_counter() - start)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Records driver-measured command durations by command and collection.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        if not isinstance(target, str):
+            target = ""
+        collection = target if target in NAMED_COLLECTIONS or not target else "org_members"
+        self._pending[(event.request_id, event.connection_id)] = collection
+
+    def _record(self, event, outcome):
+        collection = self._pending.pop((event.request_id, event.connection_id), "")
+        MONGO_COMMAND_SECONDS.labels(event.command_name, collection, outcome).observe(event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that times each outbound request for ``upstream``
+    (e.g. "auth0", "jwks", "openai") and delegates to the default transport.
+    """
+
+    def __init__(self, upstream, transport=None):
+        self.upstream = upstream
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.HTTPError as e:
+            UPSTREAM_ERRORS.labels(self.upstream, type(e).__name__).inc()
+            raise
+        UPSTREAM_REQUEST_SECONDS.labels(self.upstream, request.method, str(response.status_code)).observe(
+            time.perf_counter() - start
+        )
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def upstream_event_hooks(upstream):
+    """
+    Returns client ``event_hooks`` timing each request for ``upstream`` from
+    send to response headers, for clients whose HTTP stack isn't httpx
+    (openai >= 3 is built on httpx2) so InstrumentedTransport can't be used.
+    Failures without a response aren't seen here; callers count those.
+    """
+    async def on_request(request):
+        request.extensions["metrics_started_at"] = time.perf_counter()
+
+    async def on_response(response):
+        started_at = response.request.extensions.get("metrics_started_at")
+        if started_at is not None:
+            UPSTREAM_REQUEST_SECONDS.labels(upstream, response.request.method, str(response.status_code)).observe(
+                time.perf_counter() - started_at
+            )
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def render_metrics():
+    """
+    Returns ``(body, content_type)`` for the /metrics endpoint.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
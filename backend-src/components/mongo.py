@@ -0,0 +1,75 @@
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from fastapi import FastAPI, Request
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+from pymongo.server_api import ServerApi
+
+from components.metrics import MongoCommandMetrics
+
+MONGO_DB_NAME = "memberdb"
+
+
+def get_mongo_uri():
+    """
+    Returns the MongoDB connection string from the environment.
+
+    :return: The value of MONGO_URI.
+    :raises ValueError: If MONGO_URI is not set.
+    """
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        raise ValueError("MongoDB URI not found in environment variables")
+    return uri
+
+
+def _client_options():
+    # Pool sizing can be tuned per deployment without a code change
+    return {
+        "server_api": ServerApi("1"),
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    }
+
+
+def create_async_client(uri=None):
+    """
+    Creates the pooled async client shared by every route handler.
+    """
+    return AsyncMongoClient(uri or get_mongo_uri(), event_listeners=[MongoCommandMetrics()], **_client_options())
+
+
+@lru_cache(maxsize=None)
+def get_sync_client():
+    """
+    Returns a process-wide pooled sync client for scripts and background jobs
+    (alerts, CSV import, Sheets sync) that do not run inside the event loop.
+    """
+    return MongoClient(get_mongo_uri(), **_client_options())
+
+
+def get_sync_db() -> Database:
+    return get_sync_client()[MONGO_DB_NAME]
+
+
+@asynccontextmanager
+async def mongo_lifespan(app: FastAPI):
+    """
+    Opens the app-wide MongoDB client on startup and closes it on shutdown.
+    """
+    client = create_async_client()
+    app.state.mongo_client = client
+    try:
+        yield
+    finally:
+        await client.close()
+
+
+def get_db(request: Request) -> AsyncDatabase:
+    """
+    FastAPI dependency returning the shared member database.
+    """
+    return request.app.state.mongo_client[MONGO_DB_NAME]
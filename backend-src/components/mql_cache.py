@@ -0,0 +1,68 @@
+import re
+import threading
+
+from components.ttl_cache import TTLCache
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.?!]+$")
+
+
+def normalize_prompt(prompt):
+    """
+    Canonicalizes a natural-language prompt so trivially different phrasings
+    ("Members with GPA below 2.0?" vs "members with gpa below 2.0") share a key.
+    """
+    prompt = _WHITESPACE.sub(" ", prompt.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", prompt)
+
+
+class MQLCache:
+    """
+    LRU + TTL cache of generated MQL keyed by (org, schema version, normalized
+    prompt). Only the generated query is cached; it is always re-executed, so
+    results stay current. Tracks hit rate and the LLM latency saved by hits.
+    """
+
+    def __init__(self, maxsize=2048, ttl=3600):
+        self._queries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def key(org_name, schema_version, prompt):
+        return (org_name, schema_version, normalize_prompt(prompt))
+
+    def get(self, org_name, schema_version, prompt):
+        """
+        Returns the cached query, or None on a miss.
+        """
+        entry = self._queries.get(self.key(org_name, schema_version, prompt))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            query, generation_seconds = entry
+            self.hits += 1
+            self.saved_seconds += generation_seconds
+        return query
+
+    def set(self, org_name, schema_version, prompt, query, generation_seconds):
+        """
+        Stores a generated query along with how long the LLM took to produce it.
+        """
+        self._queries.set(self.key(org_name, schema_version, prompt), (query, generation_seconds))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_latency_seconds": round(self.saved_seconds, 3),
+            "size": len(self._queries),
+        }
+
+
+mql_cache = MQLCache()
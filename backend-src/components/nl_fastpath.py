@@ -0,0 +1,157 @@
+import json
+import re
+
+from components.mql_cache import normalize_prompt
+from components.ttl_cache import TTLCache
+
+# Words that carry no meaning for the filter ("show me all members with ...")
+FILLER_WORDS = {
+    "show", "list", "find", "get", "give", "display", "me", "all", "every", "the", "a", "an",
+    "members", "member", "people", "students", "users", "everyone", "anyone", "who", "whose",
+    "with", "that", "have", "has", "having", "are", "is", "in", "of", "our", "their", "please",
+}
+
+COMPARISONS = [
+    (r"(?:below|under|less than|lower than|smaller than|<)", "$lt"),
+    (r"(?:at most|no more than|<=)", "$lte"),
+    (r"(?:above|over|greater than|more than|higher than|>)", "$gt"),
+    (r"(?:at least|no less than|>=)", "$gte"),
+    (r"(?:equal to|equals|of|=|is)", "$eq"),
+]
+
+# Negation and alternatives can't be expressed by the filters built here
+UNSUPPORTED_WORDS = {
+    "not", "no", "nor", "never", "without", "except", "excluding", "other", "isnt", "isn't", "arent", "aren't", "or",
+}
+# Comparison phrases that contain one of the words above
+UNSUPPORTED_EXEMPT = re.compile(r"\bno (?:more|less) than\b")
+
+# A text value containing any of these is more than a single value
+# ("biology or chemistry", "gpa above 3"), so it is left to the LLM
+VALUE_BREAKS = re.compile(
+    r"[,;]|(?:^|\s)(?:" + "|".join(words for words, _ in COMPARISONS) + r")(?:\s|$)"
+)
+VALUE_PUNCTUATION = " ,.;:!?"
+
+NUMBER = r"(-?\d+(?:\.\d+)?)"
+YEAR = r"((?:19|20)\d\d)"
+GRADUATION_WORDS = ("graduat", "grad")
+
+fastpath_stats = {"hits": 0, "misses": 0}
+
+
+class FastPathParser:
+    """
+    Deterministic natural-language -> filter parser for one org schema.
+
+    Handles the common roster questions ("GPA below 2.0", "major is computer
+    science", "graduating in 2026") joined by "and". Returns None unless
+    every word of the prompt is accounted for, and for any negation or
+    "or", so anything it is not sure about falls through to the LLM.
+    """
+
+    def __init__(self, org_schema):
+        self.numeric = {}
+        self.text = {}
+        self.graduation_field = None
+
+        for field in org_schema.fields:
+            name = field["name"]
+            label = (field.get("label") or "").lower()
+            aliases = {name.lower(), label} - {""}
+            target = self.numeric if field.get("type") == "number" else self.text
+            for alias in aliases:
+                target.setdefault(alias, name)
+            if self.graduation_field is None and (
+                name.lower().startswith(GRADUATION_WORDS) or "graduat" in label
+            ):
+                self.graduation_field = name
+
+        # Longest aliases first so "home address" wins over "address"
+        self._numeric_pattern = self._alias_pattern(self.numeric)
+        self._text_pattern = self._alias_pattern(self.text)
+
+    @staticmethod
+    def _alias_pattern(aliases):
+        if not aliases:
+            return None
+        return "|".join(re.escape(alias) for alias in sorted(aliases, key=len, reverse=True))
+
+    def _parse_clause(self, clause):
+        if self.graduation_field:
+            match = re.search(rf"\b(?:graduating|graduate|graduates|graduation|grad|class of)\s+(?:in\s+|year\s+|of\s+)?{YEAR}\b", clause)
+            if match:
+                return {self.graduation_field: {"$regex": match.group(1)}}, clause[:match.start()] + clause[match.end():]
+
+        if self._numeric_pattern:
+            for words, operator in COMPARISONS:
+                match = re.search(rf"\b({self._numeric_pattern})\s+{words}\s+{NUMBER}\b", clause)
+                if match:
+                    value = float(match.group(2))
+                    condition = value if operator == "$eq" else {operator: value}
+                    return {self.numeric[match.group(1)]: condition}, clause[:match.start()] + clause[match.end():]
+
+        if self._text_pattern:
+            match = re.search(rf"\b({self._text_pattern})\s+(?:is|=|:|of)\s+(.+)$", clause)
+            if match:
+                value = self._text_value(match.group(2))
+                if value is None:
+                    return None, clause
+                pattern = f"^{re.escape(value)}$"
+                return {self.text[match.group(1)]: {"$regex": pattern, "$options": "i"}}, clause[:match.start()]
+
+        return None, clause
+
+    @staticmethod
+    def _text_value(raw):
+        """
+        Returns the value of a "field is value" clause without trailing
+        filler ("biology, please" -> "biology"), or None if anything else
+        is left in it.
+        """
+        words = raw.strip(VALUE_PUNCTUATION).split()
+        while words and words[-1].strip(VALUE_PUNCTUATION) in FILLER_WORDS:
+            words.pop()
+        value = " ".join(words).strip(VALUE_PUNCTUATION).strip("\"'").strip()
+        if not value or VALUE_BREAKS.search(value) or FILLER_WORDS.intersection(value.split()):
+            return None
+        return value
+
+    def parse(self, prompt):
+        """
+        Returns a filter dict for ``prompt``, or None if it can't be parsed with confidence.
+        """
+        prompt = normalize_prompt(prompt)
+        if UNSUPPORTED_WORDS.intersection(re.findall(r"[a-z']+", UNSUPPORTED_EXEMPT.sub(" ", prompt))):
+            return None
+
+        conditions = []
+        for clause in prompt.split(" and "):
+            condition, rest = self._parse_clause(clause)
+            if condition is None:
+                return None
+            leftover = [word for word in re.findall(r"[a-z0-9<>=.]+", rest) if word not in FILLER_WORDS]
+            if leftover:
+                return None
+            conditions.append(condition)
+
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+_parsers = TTLCache(maxsize=1024, ttl=3600)
+
+
+def parse_prompt(prompt, org_schema):
+    """
+    Tries the fast path for ``prompt``; returns the MQL filter as a JSON string or None.
+    """
+    parser = _parsers.get(org_schema.version)
+    if parser is None:
+        parser = FastPathParser(org_schema)
+        _parsers.set(org_schema.version, parser)
+
+    query = parser.parse(prompt)
+    fastpath_stats["hits" if query is not None else "misses"] += 1
+    return json.dumps(query) if query is not None else None
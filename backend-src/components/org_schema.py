@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from components.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class OrgSchema:
+    """
+    An org's member schema from the ``schemas`` collection, pre-processed once
+    so request handlers do not rebuild derived data on every call.
+    """
+    org_name: str
+    document: Dict[str, Any]
+    fields: Tuple[Dict[str, Any], ...]
+    required_fields: Tuple[str, ...]
+    version: str
+    prompt_fragment: str
+
+
+def schema_version(fields):
+    """
+    Returns a short stable hash of the schema fields, used as a cache version stamp.
+    """
+    encoded = json.dumps(fields, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def estimate_tokens(text):
+    # Rough rule of thumb for English/JSON text with OpenAI tokenizers
+    return len(text) // 4 + 1
+
+
+def build_prompt_fragment(fields, token_budget):
+    """
+    Renders schema fields as a compact one-line-per-field listing for the LLM
+    system prompt, e.g. ``gpa: number, optional (GPA)``. Labels are dropped,
+    then trailing fields, until the fragment fits ``token_budget``.
+    """
+    def line(field, with_label):
+        text = f"{field['name']}: {field.get('type', 'text')}, {'required' if field.get('required') else 'optional'}"
+        label = field.get("label")
+        return f"{text} ({label})" if with_label and label and label != field["name"] else text
+
+    for with_label in (True, False):
+        fragment = "\n".join(line(field, with_label) for field in fields)
+        if estimate_tokens(fragment) <= token_budget:
+            return fragment
+
+    lines = []
+    for field in fields:
+        candidate = "\n".join(lines + [line(field, False), "..."])
+        if estimate_tokens(candidate) > token_budget:
+            break
+        lines.append(line(field, False))
+    return "\n".join(lines + ["..."])
+
+
+def compile_schema(schema_doc):
+    """
+    Builds an OrgSchema from a raw ``schemas`` document.
+    """
+    document = {key: value for key, value in schema_doc.items() if key != "_id"}
+    fields = tuple(document.get("fields", []))
+    return OrgSchema(
+        org_name=document.get("org_name"),
+        document=document,
+        fields=fields,
+        required_fields=tuple(field["name"] for field in fields if field.get("required")),
+        version=schema_version(list(fields)),
+        prompt_fragment=build_prompt_fragment(fields, int(os.getenv("SCHEMA_PROMPT_TOKEN_BUDGET", "400"))),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_default_schema(path="schema.json"):
+    """
+    Compiles the bundled schema.json once, for orgs without a stored schema.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return compile_schema(json.load(file))
+
+
+def find_org_schema(db, org_name):
+    """
+    Returns the compiled stored schema for ``org_name`` from a synchronous
+    database (the import scripts), or None if the org has none.
+    """
+    schema_doc = db["schemas"].find_one({"org_name": org_name})
+    return compile_schema(schema_doc) if schema_doc else None
+
+
+class OrgSchemaCache:
+    """
+    Per-process cache of compiled org schemas keyed by org name.
+    """
+
+    def __init__(self, ttl=300, maxsize=1024):
+        self._schemas = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, db: AsyncDatabase, org_name):
+        """
+        Returns the compiled schema for ``org_name``, or None if it has none.
+        """
+        schema = self._schemas.get(org_name)
+        if schema is None:
+            schema_doc = await db["schemas"].find_one({"org_name": org_name})
+            if not schema_doc:
+                return None
+            schema = compile_schema(schema_doc)
+            self._schemas.set(org_name, schema)
+        return schema
+
+    async def preload(self, db: AsyncDatabase, limit=0):
+        """
+        Compiles up to ``limit`` (0 for all) stored schemas with one query so
+        the first requests after startup skip the lookup and compile.
+        Returns the compiled schemas.
+        """
+        schemas = []
+        async for schema_doc in db["schemas"].find({}, limit=limit):
+            schema = compile_schema(schema_doc)
+            self._schemas.set(schema.org_name, schema)
+            schemas.append(schema)
+        return schemas
+
+    def invalidate(self, org_name):
+        self._schemas.pop(org_name)
+
+
+org_schemas = OrgSchemaCache()
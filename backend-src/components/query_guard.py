@@ -0,0 +1,97 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from pymongo.asynchronous.database import AsyncDatabase
+
+from components.indexes import plan_stages
+
+# Query operators an LLM-generated filter may use. Server-side JavaScript
+# ($where, $function) and expression escapes ($expr) are deliberately absent.
+ALLOWED_OPERATORS = {
+    "$and", "$or", "$nor", "$not",
+    "$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin",
+    "$exists", "$type", "$regex", "$options",
+    "$all", "$elemMatch", "$size",
+}
+
+MAX_FILTER_DEPTH = 8
+
+
+class QueryRejected(ValueError):
+    """
+    Raised when a generated filter is unsafe or too expensive to run.
+    """
+
+
+@dataclass
+class GuardedQuery:
+    filter: Dict[str, Any]
+    limit: int
+    max_time_ms: int
+    projection: Optional[Dict[str, int]] = None
+
+
+def _setting(name, default):
+    return int(os.getenv(name, default))
+
+
+def validate_filter(query, depth=0):
+    """
+    Checks that ``query`` is a filter document built only from whitelisted operators.
+
+    :raises QueryRejected: On a non-document filter, an unknown operator or excessive nesting.
+    """
+    if depth == 0 and not isinstance(query, dict):
+        raise QueryRejected("Query must be a JSON object")
+    if depth > MAX_FILTER_DEPTH:
+        raise QueryRejected("Query is nested too deeply")
+    if isinstance(query, list):
+        for item in query:
+            validate_filter(item, depth + 1)
+        return
+    if not isinstance(query, dict):
+        return
+    for key, value in query.items():
+        if key.startswith("$") and key not in ALLOWED_OPERATORS:
+            raise QueryRejected(f"Operator {key} is not allowed")
+        validate_filter(value, depth + 1)
+
+
+async def guard_query(db: AsyncDatabase, collection_name, query):
+    """
+    Validates a generated filter and decides how it may run.
+
+    Every query gets a default result limit and a server-side time limit.
+    If explain() shows a collection scan over more documents than
+    MQL_COLLSCAN_THRESHOLD, the query is rewritten to return at most
+    MQL_COLLSCAN_LIMIT rows, or with MQL_COLLSCAN_ACTION=reject rejected.
+    Most roster questions filter on unindexed fields, so rejecting would
+    refuse nearly every query against a large org.
+
+    :raises QueryRejected: If the filter fails validation or is rejected as too expensive.
+    """
+    validate_filter(query)
+    guarded = GuardedQuery(
+        filter=query,
+        limit=_setting("MQL_DEFAULT_LIMIT", "500"),
+        max_time_ms=_setting("MQL_MAX_TIME_MS", "2000"),
+        projection={"_id": 0},
+    )
+
+    explain = await db.command(
+        "explain",
+        {"find": collection_name, "filter": query, "limit": guarded.limit},
+        verbosity="queryPlanner",
+    )
+    if "COLLSCAN" not in plan_stages(explain["queryPlanner"]["winningPlan"]):
+        return guarded
+
+    collection_size = await db[collection_name].estimated_document_count()
+    if collection_size <= _setting("MQL_COLLSCAN_THRESHOLD", "10000"):
+        return guarded
+
+    if os.getenv("MQL_COLLSCAN_ACTION", "limit") == "reject":
+        raise QueryRejected("Query would scan the whole roster; try filtering on an indexed field such as email")
+    guarded.limit = min(guarded.limit, _setting("MQL_COLLSCAN_LIMIT", "100"))
+    return guarded
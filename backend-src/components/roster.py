@@ -0,0 +1,64 @@
+import json
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+ROSTER_BATCH_SIZE = 500
+
+# create_org_mongo seeds each org collection with this placeholder document
+MEMBER_FILTER = {"initialized": {"$exists": False}}
+
+
+def roster_projection(org_schema, fields=None):
+    """
+    Builds the roster projection from the org schema, optionally narrowed to
+    a comma-separated ``fields`` selector. ``_id`` is always fetched because
+    pagination seeks on it; it is stripped before documents are returned.
+
+    :raises HTTPException: If ``fields`` names a field the schema doesn't define.
+    """
+    schema_fields = [field["name"] for field in org_schema.fields] if org_schema else None
+
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        if schema_fields is not None:
+            unknown = [name for name in selected if name not in schema_fields]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    elif schema_fields:
+        selected = schema_fields
+    else:
+        return None
+
+    return {"_id": 1, **{name: 1 for name in selected}}
+
+
+def parse_cursor(cursor):
+    """
+    Turns an opaque page cursor back into the ``_id`` to seek past.
+    """
+    try:
+        return ObjectId(cursor)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def find_members(collection, projection=None, after=None, limit=None):
+    """
+    Returns a cursor over members in ``_id`` order, seeking past ``after``
+    with a range query instead of skip so every page costs the same.
+    """
+    query = dict(MEMBER_FILTER)
+    if after is not None:
+        query["_id"] = {"$gt": after}
+
+    cursor = collection.find(query, projection).sort("_id", 1).batch_size(ROSTER_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+
+def dump_member(member):
+    member.pop("_id", None)
+    return json.dumps(member, default=str)
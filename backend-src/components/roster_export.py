@@ -0,0 +1,141 @@
+import os
+
+from starlette.concurrency import run_in_threadpool
+
+EXPORT_BATCH_ROWS = int(os.getenv("ROSTER_EXPORT_BATCH_ROWS", "10000"))
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+class _StreamSink:
+    """
+    Write-only file object that hands written bytes back out in chunks.
+    It keeps counting positions across drains, because the Parquet writer
+    records column-chunk offsets from ``tell()``.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def export_schema(org_schema, field_names):
+    """
+    Builds the Arrow schema for the exported columns: schema fields typed
+    ``number`` become float64, everything else a nullable string.
+    """
+    import pyarrow as pa
+
+    types = {field["name"]: field.get("type") for field in org_schema.fields} if org_schema else {}
+    return pa.schema([
+        pa.field(name, pa.float64() if types.get(name) == "number" else pa.string())
+        for name in field_names
+    ])
+
+
+def _coerce_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_record_batch(members, schema):
+    """
+    Converts one cursor batch of member documents into a record batch.
+    Values that don't fit the column type (e.g. a non-numeric GPA) become null.
+    """
+    import pyarrow as pa
+
+    columns = []
+    for field in schema:
+        values = [member.get(field.name) for member in members]
+        if pa.types.is_floating(field.type):
+            values = [_coerce_number(value) for value in values]
+        else:
+            values = [None if value is None else str(value) for value in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _open_writer(format, sink, schema):
+    import pyarrow as pa
+
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    if format == "arrow":
+        return pa.ipc.new_stream(sink, schema)
+    import pyarrow.csv as pcsv
+    return pcsv.CSVWriter(sink, schema)
+
+
+async def stream_export(members, format, org_schema, field_names=None, batch_rows=EXPORT_BATCH_ROWS):
+    """
+    Streams a member cursor as Parquet, Arrow IPC or CSV bytes.
+
+    Documents are pulled from the cursor ``batch_rows`` at a time and each
+    batch is written as one record batch (one Parquet row group), so memory
+    stays bounded by the batch size regardless of roster size. Conversion
+    and encoding run in the threadpool to keep the event loop free.
+
+    :param field_names: Columns to export; defaults to the keys of the first member.
+    """
+    sink = _StreamSink()
+    writer = schema = None
+    batch = []
+
+    def write(rows):
+        nonlocal writer, schema
+        if writer is None:
+            names = field_names
+            if names is None:
+                names = [key for key in rows[0] if key != "_id"] if rows else []
+            schema = export_schema(org_schema, names)
+            writer = _open_writer(format, sink, schema)
+        if rows:
+            writer.write_batch(to_record_batch(rows, schema))
+        return sink.drain()
+
+    async for member in members:
+        batch.append(member)
+        if len(batch) >= batch_rows:
+            data = await run_in_threadpool(write, batch)
+            batch = []
+            if data:
+                yield data
+
+    def finish(rows):
+        data = write(rows)
+        writer.close()
+        return data + sink.drain()
+
+    data = await run_in_threadpool(finish, batch)
+    if data:
+        yield data
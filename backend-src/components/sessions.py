@@ -0,0 +1,189 @@
+import json
+import logging
+import re
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+from components.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SESSION_COLLECTION = "sessions"
+SESSION_MAX_AGE = 14 * 24 * 60 * 60  # 14 days, like the signed cookie
+
+# secrets.token_urlsafe(32) output; anything else is ignored without a lookup
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{43}$")
+
+
+def _session_user(session):
+    user = session.get("user")
+    return user.get("sub") if isinstance(user, dict) else None
+
+
+class MemorySessionStore:
+    """
+    Per-worker LRU of serialized sessions. Fast, but sessions are lost on
+    restart and not shared between workers.
+
+    Stores return ``(payload, expires_at)`` from ``load``, with ``expires_at``
+    as an epoch time, or None for an unknown or expired session.
+    """
+
+    def __init__(self, maxsize=10000, ttl=SESSION_MAX_AGE):
+        self._sessions = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def load(self, session_id):
+        return self._sessions.get(session_id)
+
+    async def save(self, session_id, payload, max_age):
+        self._sessions.set(session_id, (payload, time.time() + max_age), ttl=max_age)
+
+    async def delete(self, session_id):
+        self._sessions.pop(session_id)
+
+
+class MongoSessionStore:
+    """
+    Sessions in the ``sessions`` collection, shared by every worker. Expiry
+    is left to the TTL index on ``expires_at`` (see components/indexes.py);
+    loads also check it because the TTL monitor only runs once a minute.
+
+    :param get_db: Zero-argument callable returning the async database, so
+        the store can be created before the lifespan opens the client.
+    """
+
+    def __init__(self, get_db):
+        self._get_db = get_db
+
+    def _collection(self):
+        return self._get_db()[SESSION_COLLECTION]
+
+    async def load(self, session_id):
+        doc = await self._collection().find_one(
+            {"_id": session_id, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"data": 1, "expires_at": 1},
+        )
+        if not doc:
+            return None
+        return doc["data"], doc["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+
+    async def save(self, session_id, payload, max_age):
+        await self._collection().update_one(
+            {"_id": session_id},
+            {"$set": {"data": payload, "expires_at": datetime.now(timezone.utc) + timedelta(seconds=max_age)}},
+            upsert=True,
+        )
+
+    async def delete(self, session_id):
+        await self._collection().delete_one({"_id": session_id})
+
+
+class CachedSessionStore:
+    """
+    Per-worker LRU, like ``MemorySessionStore``, in front of a shared store,
+    so most requests skip the shared store's round trip. Writes go to both.
+
+    Cached entries are kept for at most ``ttl`` seconds, which bounds how long
+    a worker can serve a session that another worker changed or deleted.
+    """
+
+    def __init__(self, backing, maxsize=10000, ttl=60):
+        self.backing = backing
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def load(self, session_id):
+        entry = self._local.get(session_id)
+        if entry is None:
+            entry = await self.backing.load(session_id)
+            if entry is not None:
+                self._local.set(session_id, entry, expires_at=entry[1])
+        return entry
+
+    async def save(self, session_id, payload, max_age):
+        await self.backing.save(session_id, payload, max_age)
+        self._local.set(session_id, (payload, time.time() + max_age))
+
+    async def delete(self, session_id):
+        self._local.pop(session_id)
+        await self.backing.delete(session_id)
+
+
+class ServerSessionMiddleware:
+    """
+    Drop-in replacement for Starlette's SessionMiddleware that keeps
+    ``request.session`` on the server and only puts an opaque random session
+    ID in the cookie.
+
+    The session is written back only when its JSON form changed during the
+    request, which also catches nested edits like
+    ``request.session["user"]["nickname"] = ...``, or once more than half of
+    ``max_age`` has passed since it was last written, which keeps active
+    sessions (and the cookie) alive like Starlette's sliding expiry. The ID is
+    replaced whenever the session's user changes, so an ID issued before
+    login is never reused.
+    """
+
+    def __init__(self, app, store, session_cookie="sid", max_age=SESSION_MAX_AGE,
+                 path="/", same_site="lax", https_only=False):
+        self.app = app
+        self.store = store
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.path = path
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def _load(self, session_id):
+        try:
+            return await self.store.load(session_id)
+        except Exception as e:
+            logger.error(f"Failed to load session: {e}")
+            return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        session_id = HTTPConnection(scope).cookies.get(self.session_cookie)
+        if session_id and not SESSION_ID_PATTERN.match(session_id):
+            session_id = None
+        entry = await self._load(session_id) if session_id else None
+        payload, expires_at = entry or (None, 0.0)
+        scope["session"] = json.loads(payload) if payload else {}
+        loaded = payload or "{}"
+        loaded_user = _session_user(scope["session"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                session = scope["session"]
+                current = json.dumps(session, default=str) if session else "{}"
+                headers = MutableHeaders(scope=message)
+                stale = payload and expires_at - time.time() < self.max_age / 2
+                if current != loaded or (session and stale):
+                    headers.add_vary_header("Cookie")
+                    try:
+                        if session:
+                            new_id = session_id
+                            if not payload or _session_user(session) != loaded_user:
+                                new_id = secrets.token_urlsafe(32)
+                                if payload:
+                                    await self.store.delete(session_id)
+                            await self.store.save(new_id, current, self.max_age)
+                            headers.append("Set-Cookie", self._cookie(new_id, f"Max-Age={self.max_age}; "))
+                        elif session_id:
+                            await self.store.delete(session_id)
+                            headers.append("Set-Cookie", self._cookie("null", "expires=Thu, 01 Jan 1970 00:00:00 GMT; "))
+                    except Exception as e:
+                        logger.error(f"Failed to save session: {e}")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _cookie(self, value, expiry):
+        return f"{self.session_cookie}={value}; path={self.path}; {expiry}{self.security_flags}"
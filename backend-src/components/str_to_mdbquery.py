@@ -1,10 +1,11 @@
 import re
-import os
 from typing import Any, Union
 import json
-from pymongo import MongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import ExecutionTimeout
+from components.query_guard import QueryRejected, guard_query
 
-def execute_mql(query_input: str, org_name: str) -> Union[Any, str]:
+async def execute_mql(db: AsyncDatabase, query_input: str, org_name: str) -> Union[Any, str]:
     """
     1. If 'query_input' is 'NO', return a specific message.
     2. If 'query_input' is recognized as a valid MQL query 
@@ -25,21 +26,28 @@ def execute_mql(query_input: str, org_name: str) -> Union[Any, str]:
     
     # Example valid: db.users.find({ GPA: { $gt: 3 } })
     else:
-        client = MongoClient(os.getenv("MONGO_URI"))
-        db = client["memberdb"]
-
         try:
             # Convert the query string to a dictionary
             query_dict = json.loads(query_input)
+            # Validate it and bound its cost before running anything
+            guarded = await guard_query(db, org_name, query_dict)
             # Perform the query
             collection = db[org_name]
-            results = collection.find(query_dict)
+            results = (
+                collection.find(guarded.filter, guarded.projection)
+                .limit(guarded.limit)
+                .max_time_ms(guarded.max_time_ms)
+            )
 
             # Convert results to a list and return
-            return list(results)
+            return await results.to_list()
 
         except json.JSONDecodeError:
             return ""
+        except QueryRejected as e:
+            return f"Query rejected: {e}"
+        except ExecutionTimeout:
+            return "Query took too long; please narrow it down"
 
     # Case 3: Neither "NO" nor recognized as MQL
     return query_input
\ No newline at end of file
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+from components.auth0_mgmt import get_auth0_client
+from components.ttl_cache import TTLCache
+
+PROFILE_FIELDS = ("email", "nickname", "name", "picture")
+
+
+@dataclass(frozen=True)
+class UserContext:
+    """
+    Everything route handlers need to know about the current user. ``profile``
+    and ``metadata`` come from Auth0 and stay None until ``resolve_profile``
+    loads them.
+    """
+    sub: str
+    org_name: Optional[str] = None
+    role: Optional[str] = None
+    profile: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class UserContextResolver:
+    """
+    Caches ``sub -> UserContext`` so handlers get org and role from memory
+    instead of reading the ``users`` collection per request.
+
+    ``resolve`` only reads the ``users`` membership document. The Auth0
+    profile and user_metadata are fetched from the (rate-limited) Management
+    API only by ``resolve_profile``, and then cached on the same context.
+    Concurrent misses for one user share a single fetch. Handlers that change
+    the user write through with ``update`` so the cache never serves what
+    they just replaced.
+    """
+
+    def __init__(self, ttl=300, maxsize=10000):
+        self._contexts = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight = {}
+
+    async def _shared(self, key, load):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def resolve(self, db, sub):
+        """
+        Returns the user's context with org and role from ``users``.
+        """
+        context = self._contexts.get(sub)
+        if context is not None:
+            return context
+        return await self._shared(("membership", sub), lambda: self._load_membership(db, sub))
+
+    async def resolve_profile(self, db, sub):
+        """
+        Returns the user's context with the Auth0 profile and metadata loaded.
+        """
+        context = await self.resolve(db, sub)
+        if context.metadata is not None:
+            return context
+        return await self._shared(("profile", sub), lambda: self._load_profile(db, sub))
+
+    async def _load_membership(self, db, sub):
+        membership = await db["users"].find_one({"user_id": sub}, {"_id": 0}) or {}
+        context = UserContext(sub=sub, org_name=membership.get("org_name"), role=membership.get("role"))
+        self._contexts.set(sub, context)
+        return context
+
+    async def _load_profile(self, db, sub):
+        auth0_response = await get_auth0_client().get_user(sub)
+        auth0_response.raise_for_status()
+        auth0_user = auth0_response.json()
+
+        context = self._contexts.get(sub) or await self._load_membership(db, sub)
+        context = replace(
+            context,
+            profile={key: auth0_user.get(key) for key in PROFILE_FIELDS},
+            metadata=auth0_user.get("user_metadata") or {},
+        )
+        self._contexts.set(sub, context)
+        return context
+
+    def update(self, sub, profile=None, metadata=None, **changes):
+        """
+        Applies a change the caller already persisted to a cached context.
+        ``profile`` and ``metadata`` are merged like Auth0's PATCH merges
+        user_metadata (when they have been loaded); an ``org_name`` in
+        ``metadata`` also updates the org. Other keyword arguments replace
+        fields outright. Uncached users are left alone and load fresh on
+        their next resolve.
+        """
+        context = self._contexts.get(sub)
+        if context is None:
+            return
+        if profile and context.profile is not None:
+            changes["profile"] = {**context.profile, **profile}
+        if metadata:
+            if context.metadata is not None:
+                changes["metadata"] = {**context.metadata, **metadata}
+            if "org_name" in metadata and "org_name" not in changes:
+                changes["org_name"] = metadata["org_name"]
+        self._contexts.set(sub, replace(context, **changes))
+
+    def invalidate(self, sub):
+        self._contexts.pop(sub)
+
+
+user_contexts = UserContextResolver(
+    ttl=int(os.getenv("USER_CONTEXT_TTL", "300")),
+    maxsize=int(os.getenv("USER_CONTEXT_CACHE_SIZE", "10000")),
+)
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+
+from components.indexes import ensure_indexes
+from components.member_validator import get_validator
+from components.org_schema import load_default_schema, org_schemas
+
+logger = logging.getLogger(__name__)
+
+# The index build task while it runs; stop_background cancels it on shutdown
+_background = set()
+
+
+async def _compile_schemas(db, limit):
+    schemas = [load_default_schema()] + await org_schemas.preload(db, limit)
+    for schema in schemas:
+        get_validator(schema.fields, schema.version)
+    return len(schemas)
+
+
+async def _step(name, coro, timings):
+    start = time.perf_counter()
+    try:
+        await coro
+    except Exception as e:
+        logger.error(f"Warm-up step {name} failed: {e}")
+    else:
+        timings[name] = round(time.perf_counter() - start, 3)
+
+
+async def _build_indexes(db):
+    timings = {}
+    await _step("indexes", ensure_indexes(db), timings)
+    if timings:
+        logger.info(f"Indexes ensured in {timings['indexes']}s")
+
+
+async def warm_up(db, jwks_cache, schema_limit=500, timeout=10.0):
+    """
+    Fills the caches the first requests would otherwise fill: prefetches the
+    JWKS and OIDC metadata and compiles stored org schemas and their member
+    validators. Steps run concurrently; a step that fails, or is still
+    running after ``timeout`` seconds, is logged and left to happen on
+    demand, so warm-up never stops the app from starting.
+
+    Index creation is started in the background instead: it is never
+    cancelled by the timeout, and logs its own timing when it finishes.
+
+    :return: Seconds taken by each step that completed.
+    """
+    timings = {}
+    index_build = asyncio.create_task(_build_indexes(db))
+    _background.add(index_build)
+    index_build.add_done_callback(_background.discard)
+
+    steps = [
+        _step("jwks", jwks_cache.refresh(), timings),
+        _step("oidc_metadata", jwks_cache.get_oidc_metadata(), timings),
+        _step("schemas", _compile_schemas(db, schema_limit), timings),
+    ]
+    try:
+        await asyncio.wait_for(asyncio.gather(*steps), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Warm-up timed out after {timeout}s; completed steps: {sorted(timings)}")
+    logger.info(f"Warm-up finished: {timings}")
+    return timings
+
+
+async def stop_background():
+    """
+    Cancels and waits for a still-running index build, so shutdown can
+    close the Mongo client without it running underneath.
+    """
+    tasks = list(_background)
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            logger.info("Index build cancelled by shutdown")
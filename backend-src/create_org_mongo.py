@@ -1,40 +1,31 @@
 from dotenv import find_dotenv, load_dotenv
-import os
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
+from pymongo.asynchronous.database import AsyncDatabase
+from components.indexes import ensure_org_indexes
 
 ENV_FILE = find_dotenv()
 if ENV_FILE:
     load_dotenv(ENV_FILE)
 
-def create_new_collection(db, name):
+async def create_new_collection(db, name):
     collection_name = name.replace(" ", "_").lower()
-    existing_collections = db.list_collection_names()
+    existing_collections = await db.list_collection_names()
     
     if collection_name not in existing_collections:
-        db.create_collection(collection_name)
+        await db.create_collection(collection_name)
     else:
         print("Name taken/Organization already exists!")
 
 
-def create_org_mongo(org_name):
+async def create_org_mongo(db: AsyncDatabase, org_name):
     if not org_name or not isinstance(org_name, str):
         raise ValueError("Organization name must be a non-empty string")
 
-    uri = os.getenv("MONGO_URI")
-    if not uri:
-        raise ValueError("MongoDB URI not found in environment variables")
-
     try:
-        client = MongoClient(uri, server_api=ServerApi('1'))
-        # Test the connection
-        client.admin.command('ping')
-        
-        db = client["memberdb"]
-        create_new_collection(db, org_name)
+        await create_new_collection(db, org_name)
 
         collection_name = org_name.replace(" ", "_").lower()
         org_collection = db[collection_name]
+        await ensure_org_indexes(db, collection_name)
 
         # Schemas to be stored
         schema_collection = db["schemas"]
@@ -53,12 +44,15 @@ def create_org_mongo(org_name):
             ]
         }
 
-        existing_schema = schema_collection.find_one({"org_name": org_name})
-        if not existing_schema:
-            schema_collection.insert_one(schema_document)
+        # Unique index on org_name makes this a single idempotent write
+        await schema_collection.update_one(
+            {"org_name": org_name},
+            {"$setOnInsert": schema_document},
+            upsert=True
+        )
 
-        if org_collection.count_documents({}) == 0:
-            org_collection.insert_one({"initialized": True})  # Placeholder document
+        if await org_collection.count_documents({}) == 0:
+            await org_collection.insert_one({"initialized": True})  # Placeholder document
 
 
         return True
@@ -66,6 +60,3 @@ def create_org_mongo(org_name):
     except Exception as e:
         print(f"Error creating organization: {e}")
         return False
-        
-    finally:
-        client.close() 
\ No newline at end of file
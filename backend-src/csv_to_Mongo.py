@@ -1,71 +1,97 @@
+import argparse
 import csv
 from dotenv import find_dotenv, load_dotenv
-import os
-from datetime import datetime
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
-import json
+from itertools import islice
+
+from components.bulk_writer import IngestStats, write_chunk
+from components.indexes import org_collection_name
+from components.member_import import build_column_map, load_schema_fields, map_rows
+from components.member_validator import get_validator
+from components.mongo import get_sync_db
+from components.org_schema import find_org_schema
 
 ENV_FILE = find_dotenv()
 if ENV_FILE:
     load_dotenv(ENV_FILE)
 
-def load_schema(schema_path="schema.txt"):
+def load_schema(schema_path="schema.json"):
     """
-    Loads the schema mapping from schema.txt file.
-    Each line in schema.txt represents a field name that maps to CSV columns.
+    Loads the member fields from schema.json.
     Args:
         schema_path: Path to the schema definition file
         
     Returns:
-        list: List of field names to map from CSV to MongoDB
+        list: Field definitions ({"name", "label", "type", "required"})
         
     Note:
-        The schema file should contain one field name per line,
-        matching the order of CSV columns
+        CSV columns are matched to fields by label (the Google Form
+        question) or by field name, ignoring case
     """
     try:
-        with open(schema_path, 'r') as f:
-            # Remove empty lines and whitespace
-            schema = [line.strip() for line in f.readlines() if line.strip()]
-        return schema
+        return load_schema_fields(schema_path)
     except Exception as e:
         print(f"Error loading schema: {str(e)}")
         return None
-    
-def main():
-    uri = os.getenv("MONGO_URI")
-    
-    client = MongoClient(uri, server_api=ServerApi('1'))
-    
-    db = client["memberdb"]
-    collection = db["members"]
-    
-    csv_path = "form_responses.csv" #Configure
-    
-    documents = []
-    
+
+
+def write_in_chunks(rows, collection, key, chunk_size, stats, overwrite=False):
+    """
+    Writes mapped (row_number, document) pairs in bounded bulk_write batches,
+    inserting new members only, or also updating existing ones with ``overwrite``.
+    """
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        write_chunk(collection, chunk, key, stats, overwrite)
+
+
+def import_csv(csv_path, collection, fields, key="email", chunk_size=1000, version=None):
+    """
+    Streams a CSV into ``collection`` in chunks of ``chunk_size`` rows,
+    deduplicating on ``key`` within each chunk and against the database.
+    Pass the schema's ``version`` when you have it to reuse its validator.
+
+    Returns:
+        IngestStats: Counts of inserted, existing, duplicate and rejected rows
+    """
+    stats = IngestStats()
+    validator = get_validator(fields, version)
+
     with open(csv_path, newline='', encoding='utf-8') as csvfile:
         reader = csv.DictReader(csvfile)
+        column_map = build_column_map(reader.fieldnames or [], fields)
+        rows = map_rows(reader, column_map, validator, stats)
+        write_in_chunks(rows, collection, key, chunk_size, stats)
 
-        schema = json.load(open("schema.json"))
-        
-        for row in reader:
-            checkEmail = row["Email"]
-            if not collection.find_one({"email": checkEmail}):
-                doc = { 
-                    mongo_field: row[csv_field] 
-                    for mongo_field, csv_field in schema.items()
-                }
-            
-                documents.append(doc)
+    return stats
     
-    if documents:
-        collection.insert_many(documents)
+def main():
+    parser = argparse.ArgumentParser(description="Import form responses from a CSV into MongoDB")
+    parser.add_argument("csv_path", nargs="?", default="form_responses.csv")
+    parser.add_argument("--org", help="import into this organization's collection, validated by its stored schema")
+    parser.add_argument("--collection", help="target collection (default: the org's, or members)")
+    parser.add_argument("--schema", default="schema.json", help="fields when the org has no stored schema")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = get_sync_db()
+    schema = find_org_schema(db, args.org) if args.org else None
+    if schema is not None:
+        fields, version = schema.fields, schema.version
     else:
+        fields, version = load_schema(args.schema), None
+    if not fields:
+        return
+
+    collection_name = args.collection or (org_collection_name(args.org) if args.org else "members")
+    stats = import_csv(args.csv_path, db[collection_name], fields, chunk_size=args.chunk_size, version=version)
+
+    if stats.rows_read == 0:
         print("No CSV file or CSV empty")
-    
-    client.close()
+    print(stats.summary())
+    for row_number, message in stats.errors:
+        print(f"  row {row_number}: {message}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
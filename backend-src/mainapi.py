@@ -1,30 +1,38 @@
 from typing import Union, Dict, Any
 from fastapi import FastAPI, Depends, Request, HTTPException, Security, Header
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, Response
 from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel
 from fastapi.security import OAuth2, OAuth2AuthorizationCodeBearer
-from authlib.integrations.starlette_client import OAuth
 from starlette.middleware.sessions import SessionMiddleware
 import os
 from dotenv import find_dotenv, load_dotenv
 from functools import wraps
-from openai import OpenAI
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path  # Add this import
-import json
+from contextlib import asynccontextmanager
+import hashlib
+import time
+from datetime import datetime, timezone
 from jose import jwt
-from urllib.request import urlopen
-from authlib.integrations.requests_client import OAuth2Session
 from protectedroutes import sub_router  # Add this import
-import requests
-from pymongo import MongoClient
-import pandas as pd
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
 import logging
 from fastapi.middleware.cors import CORSMiddleware
-from components.schema_to_str import json_to_string
 from fastapi.openapi.utils import get_openapi
 from components.str_to_mdbquery import execute_mql
+from components.mongo import MONGO_DB_NAME, get_db, mongo_lifespan
+from components.jwks_cache import JWKSCache
+from components.ttl_cache import TTLCache
+from components.auth0_mgmt import get_auth0_client, close_auth0_client
+from components.invite_cache import invite_codes
+from components.org_schema import load_default_schema, org_schemas
+from components.mql_cache import mql_cache
+from components.nl_fastpath import fastpath_stats, parse_prompt
+from components.llm_client import get_llm_client, close_llm_client
+from components.member_validator import MemberValidationError, get_validator
+from components.sessions import CachedSessionStore, MemorySessionStore, MongoSessionStore, ServerSessionMiddleware
+from components.user_context import user_contexts
+from components.metrics import MetricsMiddleware, render_metrics
+from components.warmup import stop_background, warm_up
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -36,6 +44,26 @@ ENV_FILE = find_dotenv()
 if ENV_FILE:
     load_dotenv(ENV_FILE)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens shared clients on startup and closes them on shutdown.
+    """
+    async with mongo_lifespan(app):
+        await warm_up(
+            app.state.mongo_client[MONGO_DB_NAME],
+            jwks_cache,
+            schema_limit=int(os.getenv("WARMUP_SCHEMA_LIMIT", "500")),
+            timeout=float(os.getenv("WARMUP_TIMEOUT", "10")),
+        )
+        try:
+            yield
+        finally:
+            # Before mongo_lifespan closes the client the build still uses
+            await stop_background()
+    await close_auth0_client()
+    await close_llm_client()
+
 # Add OAuth2 scheme for Swagger UI
 class OAuth2AuthorizationCodeBearer(OAuth2):
     def __init__(
@@ -75,6 +103,7 @@ app = FastAPI(
     title="OrgCRM",
     description="API with Auth0 authentication",
     version="1.0.0",
+    lifespan=lifespan,
     swagger_ui_oauth2_redirect_url="/oauth2-redirect",
     swagger_ui_init_oauth={
         "clientId": os.getenv("AUTH0_CLIENT_ID"),
@@ -86,13 +115,28 @@ app = FastAPI(
     }
 )
 
-# Configure session middleware
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=os.getenv("APP_SECRET_KEY"),
-    same_site="lax",   # Allows the cookie in cross-site requests during development
-    https_only=False   # Disable secure flag for local HTTP testing
-)
+# Configure session middleware. "mongo" (default: a per-worker cache in front of
+# the sessions collection) and "memory" keep the session server-side behind an
+# opaque ID; "cookie" is the old signed-cookie session.
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "mongo")
+if SESSION_BACKEND == "cookie":
+    app.add_middleware(
+        SessionMiddleware,
+        secret_key=os.getenv("APP_SECRET_KEY"),
+        same_site="lax",   # Allows the cookie in cross-site requests during development
+        https_only=False   # Disable secure flag for local HTTP testing
+    )
+else:
+    app.add_middleware(
+        ServerSessionMiddleware,
+        store=MemorySessionStore() if SESSION_BACKEND == "memory"
+        else CachedSessionStore(
+            MongoSessionStore(lambda: app.state.mongo_client[MONGO_DB_NAME]),
+            ttl=int(os.getenv("SESSION_CACHE_TTL", "60")),
+        ),
+        same_site="lax",
+        https_only=False
+    )
 
 # Add these environment variables after the existing load_dotenv(ENV_FILE)
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")  # Default to local URL
@@ -110,26 +154,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # "*" is not a wildcard for credentialed requests, so name the headers clients read
+    expose_headers=["*", "X-Next-Cursor"],
     max_age=3600,
 )
 
+# Added last so it is outermost and times the whole middleware stack
+app.add_middleware(MetricsMiddleware)
 
 
-# Configure OAuth for login flow
-oauth = OAuth()
-oauth.register(
-    "auth0",
-    client_id=os.getenv("AUTH0_CLIENT_ID"),
-    client_secret=os.getenv("AUTH0_CLIENT_SECRET"),
-    client_kwargs={
-        "scope": "openid profile email",  # Make sure 'email' is included
-        "response_type": "code",
-        "audience": os.getenv("AUTH0_AUDIENCE")
-    },
-    server_metadata_url=f'https://{os.getenv("AUTH0_DOMAIN")}/.well-known/openid-configuration',
-    use_state=False
-)
+
+_oauth = None
+
+
+def get_oauth():
+    """
+    Returns the OAuth client for the login flow, created on first use;
+    authlib is only needed by /login and /auth.
+    """
+    global _oauth
+    if _oauth is None:
+        from authlib.integrations.starlette_client import OAuth
+
+        _oauth = OAuth()
+        _oauth.register(
+            "auth0",
+            client_id=os.getenv("AUTH0_CLIENT_ID"),
+            client_secret=os.getenv("AUTH0_CLIENT_SECRET"),
+            client_kwargs={
+                "scope": "openid profile email",  # Make sure 'email' is included
+                "response_type": "code",
+                "audience": os.getenv("AUTH0_AUDIENCE")
+            },
+            use_state=False
+        )
+    return _oauth
+
+
+async def get_auth0_oauth():
+    """
+    Returns the Auth0 OAuth client with the tenant's OpenID configuration
+    taken from ``jwks_cache``, so the login flow doesn't fetch it again.
+    """
+    client = get_oauth().auth0
+    client.server_metadata.update(await jwks_cache.get_oidc_metadata())
+    return client
 
 #########################
 # Authentication System #
@@ -140,6 +209,19 @@ ALGORITHMS = ["RS256"]
 AUTH0_DOMAIN = os.getenv('AUTH0_DOMAIN')
 API_AUDIENCE = os.getenv('AUTH0_AUDIENCE')
 
+# Signing keys are cached in-process; AUTH0_BASE_URL lets tests point at a local stand-in
+jwks_cache = JWKSCache(
+    os.getenv("AUTH0_BASE_URL", f"https://{AUTH0_DOMAIN}"),
+    ttl=int(os.getenv("JWKS_CACHE_TTL", "3600")),
+)
+
+# Verified claims keyed by a hash of the token (never the raw token), expiring
+# at the token's exp or after CLAIMS_CACHE_TTL seconds, whichever is sooner
+claims_cache = TTLCache(
+    maxsize=int(os.getenv("CLAIMS_CACHE_SIZE", "10000")),
+    ttl=int(os.getenv("CLAIMS_CACHE_TTL", "300")),
+)
+
 def decode_jwt(token):
     # Decode the JWT token
     try:
@@ -169,6 +251,31 @@ async def get_token(request: Request, authorization: str = Header(default=None))
     return token
 
 
+async def verify_access_token(token):
+    """
+    Verifies an Auth0 access token against the cached JWKS and returns its claims.
+    Tokens that already passed verification are served from the claims cache.
+    """
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    claims = claims_cache.get(cache_key)
+    if claims is not None:
+        return claims
+
+    unverified_header = jwt.get_unverified_header(token)
+    rsa_key = await jwks_cache.get_signing_key(unverified_header.get("kid"))
+
+    if not rsa_key:
+        raise HTTPException(status_code=401, detail = "Invalid Token: No matching key found")
+
+    claims = jwt.decode(
+        token,
+        rsa_key,
+        algorithms=ALGORITHMS,
+        audience=API_AUDIENCE,
+        issuer=f"https://{AUTH0_DOMAIN}/"
+    )
+    claims_cache.set(cache_key, claims, expires_at=claims.get("exp"))
+    return claims
 
 
 # Replace the require_auth function with this updated version
@@ -177,37 +284,16 @@ async def require_auth(request: Request, token: str = Security(get_token)):
     logger.info("Token from header or session: %s", token)
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
+
+    # Already verified earlier in this request (e.g. router and route both depend on it)
+    if getattr(request.state, "auth_token", None) == token:
+        return request.state.user
     
     try:
-        # Get the JWKS from Auth0
-        jwks = json.loads(urlopen(f"https://{AUTH0_DOMAIN}/.well-known/jwks.json").read())
-        
-        unverified_header = jwt.get_unverified_header(token)
-        rsa_key = {}
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                break
-
-        if not rsa_key:
-            raise HTTPException(status_code=401, detail = "Invalid Token: No matching key found")
-            
-        if rsa_key:
-            payload = jwt.decode(
-                token,
-                rsa_key,
-                algorithms=ALGORITHMS,
-                audience=API_AUDIENCE,
-                issuer=f"https://{AUTH0_DOMAIN}/"
-            )
-            request.state.user = payload
-            return payload
+        payload = await verify_access_token(token)
+        request.state.user = payload
+        request.state.auth_token = token
+        return payload
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
@@ -232,7 +318,8 @@ async def login(request: Request):
         redirect_uri = f"{BACKEND_URL}/auth"
         logger.info(f"Login attempt with redirect URI: {redirect_uri}")
         
-        return await oauth.auth0.authorize_redirect(
+        oauth_client = await get_auth0_oauth()
+        return await oauth_client.authorize_redirect(
             request,
             redirect_uri,
             response_type="code",
@@ -249,41 +336,17 @@ async def auth(request: Request):
     OAuth2 callback endpoint that handles the response from Auth0.
     """
     try:
-        token = await oauth.auth0.authorize_access_token(request)
+        oauth_client = await get_auth0_oauth()
+        token = await oauth_client.authorize_access_token(request)
         
-        userinfo = await oauth.auth0.userinfo(token=token)
+        userinfo = await oauth_client.userinfo(token=token)
         
         # Verify the token and get claims
         access_token = token.get("access_token")
         if access_token:
-            # Get the JWKS from Auth0
-            jwks = json.loads(
-                urlopen(f"https://{AUTH0_DOMAIN}/.well-known/jwks.json").read()
-            )
-            
-            unverified_header = jwt.get_unverified_header(access_token)
-            rsa_key = {}
-            for key in jwks["keys"]:
-                if key["kid"] == unverified_header["kid"]:
-                    rsa_key = {
-                        "kty": key["kty"],
-                        "kid": key["kid"],
-                        "use": key["use"],
-                        "n": key["n"],
-                        "e": key["e"]
-                    }
-                    break
-
-            if rsa_key:
-                verified_claims = jwt.decode(
-                    access_token,
-                    rsa_key,
-                    algorithms=ALGORITHMS,
-                    audience=API_AUDIENCE,
-                    issuer=f"https://{AUTH0_DOMAIN}/"
-                )
-                # Merge verified claims with userinfo
-                userinfo.update(verified_claims)
+            verified_claims = await verify_access_token(access_token)
+            # Merge verified claims with userinfo
+            userinfo.update(verified_claims)
         
         # Store both token and verified userinfo in session
         request.session["user"] = {
@@ -374,29 +437,25 @@ async def protected_route(request: Request, token_data: dict = Depends(require_a
 async def join_org(
     invite_code: str,
     data: dict,
-    request: Request):
+    request: Request,
+    db: AsyncDatabase = Depends(get_db)):
     try:
         # Get the user from the session
         # user = request.session.get("user")
         # if not user:
         #     raise HTTPException(status_code=401, detail="Not authenticated")
 
-        client = MongoClient(os.getenv("MONGO_URI"))
-        db = client["memberdb"]
-        orgs_collection = db["organizations"]
-        org_doc = orgs_collection.find_one({"invite_code": invite_code})
+        resolved = await invite_codes.resolve(db, invite_code)
 
-        if not org_doc:
+        if not resolved:
             raise HTTPException(status_code=400, detail="Invalid Invite Code")
         
-        org_name = org_doc["org_name"]
+        org_name, org_schema = resolved
         collection_name = org_name.replace(" ", "_").lower()
         org_collection = db[collection_name]
 
         # get the schema for validation
-        schema_collection = db["schemas"]
-        schema_doc = schema_collection.find_one({"org_name": org_name})
-        if not schema_doc:
+        if not org_schema:
             raise HTTPException(status_code=404, detail="Schema Not Found")
 
         # Update Auth0 user metadata with organization
@@ -416,52 +475,66 @@ async def join_org(
         #         detail="Failed to update user organization in Auth0"
         #     )
         
-        required_fields = [field["name"] for field in schema_doc["fields"] if field["required"]]
-        for field in required_fields:
-            if field not in data or not data[field]:
-                raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-
+        # Coerces types (e.g. gpa to a number) and drops fields the schema doesn't define
+        try:
+            member = get_validator(org_schema.fields, org_schema.version).validate(data)
+        except MemberValidationError as e:
+            raise HTTPException(status_code=400, detail=e.errors)
 
         # Update session with new org_name
         # user['org_name'] = org_name
         # request.session["user"] = user
         # data["user_id"] = user["sub"]
 
-        org_collection.insert_one(data)
+        # Drives incremental alert evaluation in alerts.py
+        member["updated_at"] = datetime.now(timezone.utc)
+        await org_collection.insert_one(member)
+
+        # Record the membership for signed-in users so their org resolves
+        # from the users collection and the cached context. An existing role
+        # in the same org (e.g. its admin joining the roster) is kept.
+        user = request.session.get("user")
+        if user:
+            membership = await db["users"].find_one_and_update(
+                {"user_id": user["sub"]},
+                [{"$set": {
+                    "role": {"$cond": [{"$eq": ["$org_name", org_name]}, {"$ifNull": ["$role", "member"]}, "member"]},
+                    "org_name": org_name,
+                }}],
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            user_contexts.update(user["sub"], org_name=org_name, role=membership["role"])
 
-        client.close()
         return {"message": f"You joined {org_name}"}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 @app.get("/get-schema")
-async def get_schema(invite_code: str):
+async def get_schema(invite_code: str, db: AsyncDatabase = Depends(get_db)):
     """
     We finna get org schema based on invite code
     """
 
     try:
 
-        client = MongoClient(os.getenv("MONGO_URI"))
-        db = client["memberdb"]
-
-        orgs_collection = db["organizations"]
-        org_doc = orgs_collection.find_one({"invite_code": invite_code})
+        resolved = await invite_codes.resolve(db, invite_code)
 
-        if not org_doc:
+        if not resolved:
             raise HTTPException(status_code=400, detail="Invalid Invite Code")
         
-        org_name = org_doc["org_name"]
-
-        schema_collection = db["schemas"]
-        schema_doc = schema_collection.find_one({"org_name": org_name}, {"_id": 0})
+        org_name, org_schema = resolved
 
-        if not schema_doc:
+        if not org_schema:
             raise HTTPException(status_code=404, detail="Schema Not Found")
         
-        return schema_doc
+        return org_schema.document
     
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching schema: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -477,9 +550,12 @@ app.include_router(
 
 
 
+# Deterministic by default so cached and freshly generated queries agree
+MQL_TEMPERATURE = float(os.getenv("MQL_TEMPERATURE", "0"))
+
 # OpenAI MQL generation endpoint
 @app.post("/generate-mql")
-async def generate_mql(request: Request):
+async def generate_mql(request: Request, db: AsyncDatabase = Depends(get_db)):
     """
     Generates MongoDB query (MQL) based on natural language prompt using OpenAI
     Args:
@@ -493,34 +569,45 @@ async def generate_mql(request: Request):
         
         if not prompt or not org_name:
             raise HTTPException(status_code=400, detail="Missing Required Parameters")
-        
 
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
+        # The org's own schema, compiled once into a compact prompt fragment
+        org_schema = await org_schemas.get(db, org_name) or load_default_schema()
+        schema_version = org_schema.version
+
+        # Common question shapes are answered by the rule-based parser in microseconds
+        mql_query = parse_prompt(prompt, org_schema)
+        if mql_query is not None:
+            return { 'rows' : await execute_mql(db, mql_query, org_name) }
+
+        # A repeated prompt for the same org and schema skips the LLM entirely
+        mql_query = mql_cache.get(org_name, schema_version, prompt)
+        if mql_query is not None:
+            return { 'rows' : await execute_mql(db, mql_query, org_name) }
+
         # Construct system message based on schema presence
         system_message = "You are a MongoDB expert. Generate only MongoDB query language (MQL) code without explanation."
-        system_message += f"\nUse the following collection schema:\n{json_to_string('schema.json')}"
+        system_message += f"\nUse the following collection schema (field: type, required/optional (label)):\n{org_schema.prompt_fragment}\n"
         system_message += "There are two cases: 1) The user is asking for a query to retrieve data. 2) the user is asking for something else"
         system_message += """If the user is asking for a query to retrieve data, generate the MQL query and 
         nothing else! If the user is asking for something else, generate the word NO in capital letters and 
         absolutely nothing else! Example query: 'Show members with GPA below 2.0' -> { 'gpa': { '$lt': 2.0 } }.
         ONLY return the query in JSON format, without explanation or additional text."""
         
-        # Create the completion request
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        # Create the completion request; identical in-flight prompts share one call
+        started = time.perf_counter()
+        mql_query = await get_llm_client().complete(
+            [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": f"Generate MongoDB query for: {prompt}"}
             ],
-            temperature=0.7,
-            max_tokens=500
+            temperature=MQL_TEMPERATURE,
+            max_tokens=500,
+            coalesce_key=mql_cache.key(org_name, schema_version, prompt)
         )
         
-        # Extract the MQL from response
-        mql_query = response.choices[0].message.content
+        mql_cache.set(org_name, schema_version, prompt, mql_query, time.perf_counter() - started)
 
-        return { 'rows' : execute_mql(mql_query, org_name) }
+        return { 'rows' : await execute_mql(db, mql_query, org_name) }
         
     except Exception as e:
         return JSONResponse(
@@ -530,33 +617,43 @@ async def generate_mql(request: Request):
                 "message": "Failed to generate MongoDB query"
             }
         )
+
+
+@app.get("/generate-mql/stats")
+async def generate_mql_stats():
+    """
+    Reports the prompt cache hit rate, the LLM latency saved by hits, and how
+    many prompts the rule-based fast path answered without the LLM.
+    """
+    return {**mql_cache.stats(), "fastpath": dict(fastpath_stats)}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint: route latency and in-flight requests, Mongo
+    command timings, and Auth0/JWKS/OpenAI call timings.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
     
 @app.get("/get-org-name")
-async def get_org_name(request: Request):
+async def get_org_name(
+    request: Request,
+    token_data: dict = Depends(require_auth),
+    db: AsyncDatabase = Depends(get_db)):
     """
     Fetches the organization name of the currently logged-in user.
     """
     try:
-        # Get token from request
-        token = await get_token(request)
-        if not token:
-            raise HTTPException(status_code=401, detail="Not authenticated")
-
-        # Verify token and get claims
-        token_data = await require_auth(request, token)
-        
-        # Connect to MongoDB
-        client = MongoClient(os.getenv("MONGO_URI"))
-        db = client["memberdb"]
-        users_collection = db["users"]
-        
-        # Find user's organization
-        user_doc = users_collection.find_one({"user_id": token_data["sub"]})
-        if not user_doc or "org_name" not in user_doc:
+        context = await user_contexts.resolve(db, token_data["sub"])
+        if not context.org_name:
             raise HTTPException(status_code=404, detail="Organization not found")
         
-        return {"org_name": user_doc["org_name"]}
+        return {"org_name": context.org_name}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching organization name: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -583,28 +680,8 @@ async def verify_session(request: Request):
       logger.error(f"Session verification error: {str(e)}")
       raise HTTPException(status_code=401, detail="Session verification failed")
 
-async def get_auth0_client() -> OAuth2Session:
-    """
-    Creates an authenticated client for Auth0 Management API
-    """
-    # Create OAuth2 session with client credentials
-    auth0_client = OAuth2Session(
-        client_id=os.getenv("AUTH0_CLIENT_ID"),
-        client_secret=os.getenv("AUTH0_CLIENT_SECRET"),
-        token_endpoint=f"https://{os.getenv('AUTH0_DOMAIN')}/oauth/token"
-    )
-    
-    # Get access token for Management API
-    token = auth0_client.fetch_token(
-        url=f"https://{os.getenv('AUTH0_DOMAIN')}/oauth/token",
-        grant_type="client_credentials",
-        audience=f"https://{os.getenv('AUTH0_DOMAIN')}/api/v2/"
-    )
-    
-    return auth0_client
-    
 @app.get("/fetch-full-profile")
-async def fetch_full_profile(request: Request):
+async def fetch_full_profile(request: Request, db: AsyncDatabase = Depends(get_db)):
     try:
         user = request.session.get("user")
         if not user:
@@ -613,11 +690,9 @@ async def fetch_full_profile(request: Request):
         # Check if user metadata is already in the session
         user_metadata = user.get('user_metadata')
         if user_metadata is None:
-            # Fetch user metadata from an external service (e.g., Auth0)
-            user_id = user["sub"]
-            mgmt_token = await get_management_token()
-
-            user_metadata = await fetch_user_metadata(user_id, mgmt_token)
+            # Shared per-user context, only hits Auth0 when not cached
+            context = await user_contexts.resolve_profile(db, user["sub"])
+            user_metadata = context.metadata
             user['user_metadata'] = user_metadata
             request.session["user"] = user
 
@@ -627,30 +702,6 @@ async def fetch_full_profile(request: Request):
         raise e
     except Exception as ex:
         raise HTTPException(status_code=500, detail=str(ex))
-    
-async def get_management_token():
-    token_url = f'https://{os.getenv("AUTH0_DOMAIN")}/oauth/token'
-    token_payload = {
-        'client_id': os.getenv('AUTH0_CLIENT_ID'),
-        'client_secret': os.getenv('AUTH0_CLIENT_SECRET'),
-        'audience': f'https://{os.getenv("AUTH0_DOMAIN")}/api/v2/',
-        'grant_type': 'client_credentials',
-        'scope': 'read:users'
-    }
-
-    response = requests.post(token_url, json=token_payload)
-    response.raise_for_status()
-    return response.json()['access_token']
-
-async def fetch_user_metadata(user_id, mgmt_token):
-    get_url = f'https://{os.getenv("AUTH0_DOMAIN")}/api/v2/users/{user_id}'
-    response = requests.get(
-        get_url,
-        headers={'Authorization': f'Bearer {mgmt_token}'}
-    )
-    response.raise_for_status()
-    return response.json().get('user_metadata', {})
-
 
 @app.put("/update-nickname")
 async def update_nickname(request: Request):
@@ -659,28 +710,10 @@ async def update_nickname(request: Request):
         new_nickname = data.get('nickname')
         user_id = request.session["user"]["sub"]
         
-        # Get Management API token
-        token_response = requests.post(
-            f'https://{os.getenv("AUTH0_DOMAIN")}/oauth/token',
-            headers={'content-type': 'application/json'},
-            json={
-                'client_id': os.getenv('AUTH0_CLIENT_ID'),
-                'client_secret': os.getenv('AUTH0_CLIENT_SECRET'),
-                'audience': f'https://{os.getenv("AUTH0_DOMAIN")}/api/v2/',
-                'grant_type': 'client_credentials'
-            }
-        )
-        
-        mgmt_token = token_response.json()['access_token']
-        
         # Update user nickname
-        update_response = requests.patch(
-            f'https://{os.getenv("AUTH0_DOMAIN")}/api/v2/users/{user_id}',
-            headers={
-                'Authorization': f'Bearer {mgmt_token}',
-                'Content-Type': 'application/json'
-            },
-            json={
+        update_response = await get_auth0_client().update_user(
+            user_id,
+            {
                 'nickname': new_nickname
             }
         )
@@ -690,6 +723,7 @@ async def update_nickname(request: Request):
             
         # Update session
         request.session["user"]["nickname"] = new_nickname
+        user_contexts.update(user_id, profile={"nickname": new_nickname})
         
         return {"status": "success", "nickname": new_nickname}
         
@@ -715,38 +749,12 @@ async def complete_setup(request: Request):
         if not org_name:
             raise HTTPException(status_code=400, detail="org_name is required")
 
-        # Get existing user metadata first
-        token_url = f'https://{os.getenv("AUTH0_DOMAIN")}/oauth/token'
-        token_payload = {
-            'client_id': os.getenv('AUTH0_CLIENT_ID'),
-            'client_secret': os.getenv('AUTH0_CLIENT_SECRET'),
-            'audience': f'https://{os.getenv("AUTH0_DOMAIN")}/api/v2/',
-            'grant_type': 'client_credentials',
-            'scope': 'update:users read:users'
-        }
-
-        token_response = requests.post(
-            token_url,
-            headers={'content-type': 'application/json'},
-            json=token_payload
-        )
-
-        if not token_response.ok:
-            raise HTTPException(status_code=500, detail="Could not get management token")
-
-        mgmt_token = token_response.json()['access_token']
+        auth0_client = get_auth0_client()
 
         # Get current user metadata
-        get_url = f'https://{os.getenv("AUTH0_DOMAIN")}/api/v2/users/{user_id}'
-        user_response = requests.get(
-            get_url,
-            headers={
-                'Authorization': f'Bearer {mgmt_token}',
-                'Content-Type': 'application/json'
-            }
-        )
+        user_response = await auth0_client.get_user(user_id)
 
-        if not user_response.ok:
+        if not user_response.is_success:
             raise HTTPException(status_code=400, detail="Failed to get current user metadata")
 
 
@@ -756,23 +764,20 @@ async def complete_setup(request: Request):
         }
 
         # Patch user in Auth0 with merged metadata
-        patch_response = requests.patch(
-            get_url,
-            headers={
-                'Authorization': f'Bearer {mgmt_token}',
-                'Content-Type': 'application/json'
-            },
-            json={
+        patch_response = await auth0_client.update_user(
+            user_id,
+            {
                 "user_metadata": updated_metadata
             }
         )
         
-        if not patch_response.ok:
+        if not patch_response.is_success:
             raise HTTPException(status_code=400, detail="Auth0 user update failed")
 
         # Update session with new metadata
         session_user['user_metadata'] = updated_metadata
         request.session["user"] = session_user
+        user_contexts.update(user_id, metadata=updated_metadata)
 
         return {"status": "success", "metadata": updated_metadata, "user": session_user}
 
@@ -1,57 +1,54 @@
 # subroutes.py
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import Response, StreamingResponse
+from typing import Optional
 import os
-import requests
 import secrets
+from pymongo.errors import DuplicateKeyError
 import smtplib, ssl 
-from authlib.integrations.requests_client import OAuth2Session
 from create_org_mongo import create_org_mongo
 import logging
+import json
 import re
 
 logger = logging.getLogger(__name__)
-from pymongo import MongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from components.mongo import get_db
+from components.auth0_mgmt import get_auth0_client
+from components.invite_cache import invite_codes
+from components.org_schema import org_schemas
+from components.indexes import org_collection_name
+from components.roster import dump_member, find_members, parse_cursor, roster_projection
+from components.roster_export import EXPORT_FORMATS, stream_export
+from components.bulk_writer import IngestStats
+from components.member_import import ingest_rows, iter_csv_rows, iter_lines, iter_ndjson_rows
+from components.member_validator import get_validator
+from components.user_context import user_contexts
 
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+BULK_MAX_REPORTED_ERRORS = int(os.getenv("BULK_MAX_REPORTED_ERRORS", "1000"))
+# Fresh invite codes tried before create-org gives up on a run of collisions
+INVITE_CODE_ATTEMPTS = 5
 
-sub_router = APIRouter()
-
-async def get_auth0_client():
-    domain = os.getenv("AUTH0_DOMAIN")
-    # Use Management API specific credentials
-    client_id = os.getenv("AUTH0_MGMT_CLIENT_ID")
-    client_secret = os.getenv("AUTH0_MGMT_CLIENT_SECRET")
-
-    # Get management API access token
-    token_url = f"https://{domain}/oauth/token"
-    payload = {
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "audience": f"https://{domain}/api/v2/",
-        "grant_type": "client_credentials"
-    }
 
-    response = requests.post(token_url, json=payload)
+sub_router = APIRouter()
 
-    # Add error handling for the token request
-    if not response.ok:
-        raise HTTPException(
-            status_code=response.status_code,
-            detail=f"Failed to get Auth0 access token: {response.text}"
-        )
 
-    token_data = response.json()
-    if 'access_token' not in token_data:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid Auth0 response: {token_data}"
-        )
+def is_org_name_conflict(error: DuplicateKeyError):
+    """
+    Returns whether a duplicate key error on ``organizations`` came from the
+    org_name index rather than invite_code. Servers and drivers don't all
+    send ``keyPattern``, so the index name in ``errmsg`` is checked too.
+    """
+    details = error.details or {}
+    if "keyPattern" in details:
+        return "org_name" in details["keyPattern"]
+    index = re.search(r"index: (\S+)", details.get("errmsg") or str(error))
+    return bool(index) and index.group(1).startswith("org_name")
 
-    # Create OAuth2Session with the access token
-    client = OAuth2Session(token={"access_token": token_data["access_token"]})
-    return client
 
 @sub_router.post("/create-org")
-async def create_org(request: Request):
+async def create_org(request: Request, db: AsyncDatabase = Depends(get_db)):
     try:
         # Get the request body
         body = await request.json()
@@ -72,67 +69,28 @@ async def create_org(request: Request):
             logger.error("No user found in session")
             raise HTTPException(status_code=401, detail="Not authenticated")
         
-        client = MongoClient(os.getenv("MONGO_URI"))
-        db = client["memberdb"]
         orgs_collection = db["organizations"]
         schema_collection = db["schemas"]
 
         # checks to see if org alr exists
-        existing_org = orgs_collection.find_one({"org_name": formatted_org_name})
+        existing_org = await orgs_collection.find_one({"org_name": formatted_org_name})
         if existing_org:
             raise HTTPException(status_code=409, detail=f"Organization '{formatted_org_name}' already exists.") 
 
-        domain = os.getenv("AUTH0_DOMAIN")
-        client_id = os.getenv("AUTH0_CLIENT_ID")
-        client_secret = os.getenv("AUTH0_CLIENT_SECRET")
-        
-        # Get access token using the regular application credentials
-        token_url = f"https://{domain}/oauth/token"
-        payload = {
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "audience": f"https://{domain}/api/v2/",
-            "grant_type": "client_credentials",
-            "scope": "read:organizations read:users update:users"
-        }
-        
-        response = requests.post(token_url, json=payload)
-        if not response.ok:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Failed to get access token: {response.text}"
-            )
-        
-        token_data = response.json()
-        access_token = token_data["access_token"]
-        
-        # Create organization using the access token
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
+        # Shared Management API client with a cached access token
+        auth0_client = get_auth0_client()
         
         auth0_org = None
 
         # Create organization in Auth0
-        org_response = requests.post(
-            f"https://{domain}/api/v2/organizations",
-            headers=headers,
-            json={
-                'name': formatted_org_name,
-                'display_name': org_name,
-            }
-        )
+        org_response = await auth0_client.create_organization(formatted_org_name, org_name)
         
-        if org_response.ok:
+        if org_response.is_success:
             auth0_org = org_response.json()
         elif org_response.status_code == 409:  # Conflict - org already exists
             # Get existing organization details
-            get_org_response = requests.get(
-                f"https://{domain}/api/v2/organizations/name/{formatted_org_name}",
-                headers=headers
-            )
-            if not get_org_response.ok:
+            get_org_response = await auth0_client.get_organization_by_name(formatted_org_name)
+            if not get_org_response.is_success:
                 raise HTTPException(
                     status_code=get_org_response.status_code,
                     detail=f"Failed to get existing organization: {get_org_response.text}"
@@ -145,56 +103,47 @@ async def create_org(request: Request):
             )
         
         # Add the current user as admin of the organization
-        member_response = requests.post(
-            f"https://{domain}/api/v2/organizations/{auth0_org['id']}/members",
-            headers=headers,
-            json={
-                "members": [user['sub']]
-            }
-        )
+        member_response = await auth0_client.add_organization_members(auth0_org['id'], [user['sub']])
         
-        if not member_response.ok:
+        if not member_response.is_success:
             raise HTTPException(
                 status_code=member_response.status_code,
                 detail=f"Failed to add member to organization: {member_response.text}"
             )
         
         # Create organization in MongoDB
-        created = create_org_mongo(formatted_org_name)
+        created = await create_org_mongo(db, formatted_org_name)
         if not created:
             raise HTTPException(status_code=500, detail="Failed to Create Organization in MongoDB")
 
-        # Generate a new unique code for each org
-        invite_code = secrets.token_urlsafe(8)
-
-        existing_code = orgs_collection.find_one({"invite_code": invite_code})
-        while existing_code:
+        # Generate a new unique code for each org; the unique indexes on
+        # invite_code and org_name reject collisions and concurrent creates
+        for _ in range(INVITE_CODE_ATTEMPTS):
             invite_code = secrets.token_urlsafe(8)
-            existing_code = orgs_collection.find_one({"invite_code": invite_code})
-
-        # Saving the invite code
-        orgs_collection.insert_one({
-            "org_name": formatted_org_name,
-            "invite_code": invite_code
-        })
+            try:
+                await orgs_collection.insert_one({
+                    "org_name": formatted_org_name,
+                    "invite_code": invite_code
+                })
+                break
+            except DuplicateKeyError as e:
+                if is_org_name_conflict(e):
+                    raise HTTPException(status_code=409, detail=f"Organization '{formatted_org_name}' already exists.")
+        else:
+            raise HTTPException(status_code=500, detail="Could not generate a unique invite code")
 
         updated_metadata = {
             "org_name": formatted_org_name, "invite_code": invite_code, "completed_setup": True
         }
 
-        get_url = f'https://{os.getenv("AUTH0_DOMAIN")}/api/v2/users/{user_id}'
-        patch_response = requests.patch(
-            get_url,
-            headers={
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': 'application/json'
-            },
-            json={
+        patch_response = await auth0_client.update_user(
+            user_id,
+            {
                 "user_metadata": { 'org_name': formatted_org_name }
             }
         )
         
-        if not patch_response.ok:
+        if not patch_response.is_success:
             raise HTTPException(
                 status_code=patch_response.status_code,
                 detail=f"Failed to update user metadata: {patch_response.text}"
@@ -215,31 +164,46 @@ async def create_org(request: Request):
                     ]
         }
 
-        existing_schema = schema_collection.find_one({"org_name": formatted_org_name})
+        await schema_collection.update_one(
+            {"org_name": formatted_org_name},
+            {"$setOnInsert": schema_data},
+            upsert=True
+        )
+
+        # The creator administers the org
+        await db["users"].update_one(
+            {"user_id": user_id},
+            {"$set": {"org_name": formatted_org_name, "role": "admin"}},
+            upsert=True,
+        )
 
-        if not existing_schema:
-            schema_collection.insert_one(schema_data)
+        # Drop anything this worker cached about the new org or its code
+        invite_codes.invalidate_org(formatted_org_name)
+        invite_codes.invalidate_code(invite_code)
+        user_contexts.update(user_id, metadata={"org_name": formatted_org_name}, role="admin")
         
         user['user_metadata'] = updated_metadata
         request.session["user"] = user
-
-        client.close()
         
         return {
             "message": f"Organization '{org_name}' created successfully",
             "org_id": auth0_org['id'],
             "invite_code": invite_code
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating organization: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
     
     
     
-@sub_router.get("/get-roster")
-async def get_roster(request: Request):
+async def session_org_name(request: Request, db: AsyncDatabase):
     """
-    Retrieves the full roster of the authenticated user's organization.
+    Returns the organization of the user in the session, falling back to the
+    cached user context when the session has no user_metadata yet.
+
+    :raises HTTPException: 401 without a session user, 400 if they have no organization.
     """
     user = request.session.get("user")
     
@@ -255,19 +219,139 @@ async def get_roster(request: Request):
 
     # Get organization from user metadata
     org_name = user.get("user_metadata", {}).get("org_name")  # Access org_name from user_metadata
+    if not org_name and "sub" in user:
+        org_name = (await user_contexts.resolve(db, user["sub"])).org_name
     logger.info(f"Retrieved organization name: {org_name}")  # Log the organization name
 
     if not org_name:
         logger.error("User is not part of any organization")
         raise HTTPException(status_code=400, detail="User is not part of any organization")
 
-    client = MongoClient(os.getenv("MONGO_URI"))
-    db = client["memberdb"]
-    org_collection = db[org_name.lower().replace(" ", "")]
+    return org_name
+
 
-    # Fetch all members
-    members = list(org_collection.find({}, {"_id": 0}))  # Exclude MongoDB ObjectId
+@sub_router.get("/get-roster")
+async def get_roster(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    fields: Optional[str] = None,
+    format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    db: AsyncDatabase = Depends(get_db)):
+    """
+    Retrieves the roster of the authenticated user's organization.
+
+    Without ``limit`` the whole roster is streamed straight from the cursor.
+    With ``limit`` one page is returned along with a ``next_cursor`` to pass
+    back as ``cursor`` (in the ``X-Next-Cursor`` header for NDJSON).
+    ``fields`` is a comma-separated subset of the schema fields, and
+    ``format=ndjson`` streams one member per line.
+    """
+    org_name = await session_org_name(request, db)
+    org_collection = db[org_collection_name(org_name)]
 
-    client.close()
+    org_schema = await org_schemas.get(db, org_name)
+    projection = roster_projection(org_schema, fields)
+    after = parse_cursor(cursor) if cursor else None
+    members = find_members(org_collection, projection, after, limit)
 
-    return {"organization": org_name, "roster": members}
\ No newline at end of file
+    if limit:
+        page = await members.to_list()
+        next_cursor = str(page[-1]["_id"]) if len(page) == limit else None
+        if format == "ndjson":
+            # Lines stay one member each; the cursor travels in a header
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+            body = "".join(dump_member(member) + "\n" for member in page)
+            return Response(body, media_type="application/x-ndjson", headers=headers)
+        for member in page:
+            member.pop("_id", None)  # Exclude MongoDB ObjectId
+        return {"organization": org_name, "roster": page, "next_cursor": next_cursor}
+
+    if format == "ndjson":
+        async def stream_ndjson():
+            async for member in members:
+                yield dump_member(member) + "\n"
+
+        return StreamingResponse(stream_ndjson(), media_type="application/x-ndjson")
+
+    # Full roster: write the JSON body incrementally instead of building it in memory
+    async def stream_json():
+        yield '{"organization": ' + json.dumps(org_name) + ', "roster": ['
+        separator = ""
+        async for member in members:
+            yield separator + dump_member(member)
+            separator = ", "
+        yield "]}"
+
+    return StreamingResponse(stream_json(), media_type="application/json")
+
+
+@sub_router.get("/export-roster")
+async def export_roster(
+    request: Request,
+    format: str = Query(default="parquet", pattern="^(parquet|arrow|csv)$"),
+    fields: Optional[str] = None,
+    db: AsyncDatabase = Depends(get_db)):
+    """
+    Streams the whole roster of the user's organization as Parquet, Arrow
+    IPC stream or CSV, typed from the org schema (``number`` fields as
+    float64, the rest as strings). ``fields`` selects columns like get-roster.
+    """
+    org_name = await session_org_name(request, db)
+    collection_name = org_collection_name(org_name)
+
+    org_schema = await org_schemas.get(db, org_name)
+    projection = roster_projection(org_schema, fields)
+    field_names = [name for name in projection if name != "_id"] if projection else None
+    members = find_members(db[collection_name], projection)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_export(members, format, org_schema, field_names),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{collection_name}.{extension}"'},
+    )
+
+
+@sub_router.post("/members/bulk")
+async def bulk_import_members(
+    request: Request,
+    format: Optional[str] = Query(default=None, pattern="^(ndjson|csv)$"),
+    db: AsyncDatabase = Depends(get_db)):
+    """
+    Imports members into the user's organization from a streamed NDJSON or
+    CSV request body (``format``, or the Content-Type when omitted).
+
+    NDJSON objects use schema field names; CSV headers may be field names or
+    form labels. Rows are validated as they arrive and upserted on email in
+    batches of ``BULK_BATCH_SIZE``. Invalid rows are reported by row number
+    and never abort the upload.
+    """
+    org_name = await session_org_name(request, db)
+    org_schema = await org_schemas.get(db, org_name)
+    if not org_schema:
+        raise HTTPException(status_code=404, detail="Schema Not Found")
+
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    collection = db[org_collection_name(org_name)]
+    validator = get_validator(org_schema.fields, org_schema.version)
+    stats = IngestStats(max_errors=BULK_MAX_REPORTED_ERRORS)
+
+    lines = iter_lines(request.stream())
+    rows = iter_csv_rows(lines, org_schema.fields) if format == "csv" else iter_ndjson_rows(lines)
+
+    await ingest_rows(rows, collection, validator, stats, BULK_BATCH_SIZE)
+
+    logger.info(f"Bulk import into {org_name}: {stats.summary()}")
+    return {
+        "organization": org_name,
+        "rows_read": stats.rows_read,
+        "inserted": stats.inserted,
+        "existing": stats.existing,
+        "duplicates": stats.duplicates,
+        "rejected": stats.rejected,
+        "errors": [{"row": row_number, "message": message} for row_number, message in stats.errors],
+        "rows_per_second": round(stats.rows_per_second),
+    }